@@ -0,0 +1,82 @@
+"""
+Memory footprint of the token list and the tree.
+
+    python benchmarks/memory.py [script.or] [--scale N]
+
+Lexes and parses the script (examples/script.or repeated N times by
+default) and reports the bytes each Token, tree node and literal value
+costs on its own, for the classes as they are now (__slots__) and for
+dict-backed copies of the same dataclasses (the layout before __slots__).
+Field values are shared between both measurements, so the numbers only
+cover the per-instance overhead.
+"""
+import os
+import sys
+import argparse
+import tracemalloc
+import dataclasses
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from lexer import RegexLexer, Token
+from parser import Parser
+import tree as tree_module
+
+DEFAULT_SCRIPT = os.path.join(ROOT, "examples", "script.or")
+
+def dict_backed(cls, clones={}):
+    # Same fields and defaults, but instances keep a __dict__
+    if cls not in clones:
+        fields = [(field.name, field.type, dataclasses.field(default=field.default)) for field in dataclasses.fields(cls)]
+        clones[cls] = dataclasses.make_dataclass(cls.__name__, fields, frozen=cls.__dataclass_params__.frozen)
+    return clones[cls]
+
+def collect(node, nodes, values):
+    if isinstance(node, list):
+        for item in node:
+            collect(item, nodes, values)
+    elif dataclasses.is_dataclass(node) and not isinstance(node, type):
+        if type(node).__module__ == tree_module.__name__:
+            nodes.append(node)
+        elif not isinstance(node, Token):
+            values.append(node)
+            return
+        for field in dataclasses.fields(node):
+            collect(getattr(node, field.name), nodes, values)
+
+def instance_bytes(objects, layout):
+    # Rebuilds every object with the given layout and measures what that allocates
+    copies = [None] * len(objects)
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    for i, obj in enumerate(objects):
+        cls = layout(type(obj))
+        copies[i] = cls(*[getattr(obj, field.name) for field in dataclasses.fields(obj)])
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return used / max(len(objects), 1)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="bytes per token/node for slotted and dict-backed classes")
+    arg_parser.add_argument("script", nargs="?", default=DEFAULT_SCRIPT)
+    arg_parser.add_argument("--scale", type=int, default=1000, help="times the script is repeated (default: 1000)")
+    args = arg_parser.parse_args()
+
+    with open(args.script) as file:
+        source = (file.read() + "\n") * args.scale
+
+    tokens = list(RegexLexer(source).generate_tokens())
+    program = Parser(tokens).parse()
+    nodes, values = [], []
+    collect(program, nodes, values)
+
+    print(f"source: {len(source)} bytes, {len(tokens)} tokens, {len(nodes)} nodes, {len(values)} literal values")
+    print(f"{'':10}{'slots':>12}{'__dict__':>12}")
+    for name, objects in (("token", tokens), ("node", nodes), ("value", values)):
+        slotted = instance_bytes(objects, lambda cls: cls)
+        unslotted = instance_bytes(objects, dict_backed)
+        print(f"{name:10}{slotted:>12.1f}{unslotted:>12.1f}  bytes/{name}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+"""
+Times the lexer, parser and interpreter separately on the programs in
+benchmarks/programs, at several input sizes.
+
+    python benchmarks/run.py                          # table for every benchmark
+    python benchmarks/run.py fib loop --engine vm     # only some benchmarks
+    python benchmarks/run.py --max 1000000            # full size ladder
+    python benchmarks/run.py --json results.json      # also write JSON
+    python benchmarks/run.py --save-baseline          # store benchmarks/baseline.json
+    python benchmarks/run.py --compare                # fail on regressions against it
+
+Every program is a template where {N} is replaced by the input size. Each
+phase is run --repeat times and the fastest run is kept. The growth column
+is the exponent k in time ~ N^k between two consecutive sizes, so linear
+code stays near 1 and quadratic code near 2.
+"""
+import io
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROGRAMS_DIR = os.path.join(ROOT, "benchmarks", "programs")
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from parser import Parser
+from loader import LEXERS
+from resolver import Resolver
+from main import ENGINES
+
+PHASES = ("lex", "parse", "interpret")
+
+# NAME -> (TEMPLATE, SIZES)
+BENCHMARKS = {
+    "fib": ("fib.or", [10, 15, 20]),
+    "factorial": ("factorial.or", [10, 20, 40, 80]),
+    "tail_factorial": ("tail_factorial.or", [100, 1000, 10000, 100000, 1000000]),
+    "loop": ("loop.or", [1000, 10000, 100000, 1000000]),
+    "range": ("range.or", [1000, 10000, 100000, 1000000]),
+    "array": ("array.or", [1000, 10000, 100000, 1000000]),
+    "strings": ("strings.or", [1000, 10000, 100000, 1000000]),
+    "map": ("map.or", [1000, 10000, 100000, 1000000]),
+    "set": ("set.or", [1000, 10000, 100000, 1000000]),
+    "vector": ("vector.or", [1000, 10000, 100000, 1000000]),
+    "import": ("import.or", [100, 1000, 10000, 100000]),
+}
+
+def write_import_module(directory, size):
+    # import.or loads a generated module with one declaration per unit of size
+    lines = [f"var value{i} = {i};" for i in range(size)]
+    lines.append(f"var last = {size};")
+    with open(os.path.join(directory, "bench_module.or"), "w") as file:
+        file.write("\n".join(lines) + "\n")
+
+def load_template(name):
+    with open(os.path.join(PROGRAMS_DIR, BENCHMARKS[name][0])) as file:
+        return file.read()
+
+def run_once(source, engine, lexer):
+    times = {}
+
+    start = time.perf_counter()
+    tokens = list(LEXERS[lexer](source).generate_tokens())
+    times["lex"] = time.perf_counter() - start
+
+    # Resolving is part of getting a runnable tree, so it counts as parse time
+    start = time.perf_counter()
+    tree = Parser(tokens).parse()
+    Resolver().resolve(tree)
+    times["parse"] = time.perf_counter() - start
+
+    interpreter = ENGINES[engine]()
+    interpreter.use_cache = False
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter.interpret(tree)
+    times["interpret"] = time.perf_counter() - start
+    return times
+
+def run_benchmark(name, size, engine, lexer, repeat, workdir):
+    source = load_template(name).replace("{N}", str(size))
+    if name == "import":
+        write_import_module(workdir, size)
+
+    best = None
+    old_cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        for _ in range(repeat):
+            times = run_once(source, engine, lexer)
+            best = times if best is None else {phase: min(best[phase], times[phase]) for phase in PHASES}
+    finally:
+        os.chdir(old_cwd)
+
+    best["total"] = sum(best[phase] for phase in PHASES)
+    return best
+
+def growth(results, size, previous):
+    if previous is None:
+        return None
+    t1, t2 = results[str(previous)]["interpret"], results[str(size)]["interpret"]
+    if t1 <= 0 or t2 <= 0:
+        return None
+    return math.log(t2 / t1) / math.log(size / previous)
+
+def print_table(report):
+    print(f"engine={report['meta']['engine']} lexer={report['meta']['lexer']} repeat={report['meta']['repeat']}")
+    print(f"{'benchmark':<15}{'N':>9}{'lex ms':>10}{'parse ms':>10}{'interp ms':>11}{'us/N':>9}{'growth':>8}")
+    for name, results in report["results"].items():
+        previous = None
+        for size_key, times in results.items():
+            size = int(size_key)
+            k = growth(results, size, previous)
+            print(f"{name:<15}{size:>9}{times['lex']*1000:>10.2f}{times['parse']*1000:>10.2f}"
+                  f"{times['interpret']*1000:>11.2f}{times['interpret']*1e6/size:>9.2f}"
+                  f"{'' if k is None else f'{k:.2f}':>8}")
+            previous = size
+
+def compare(report, baseline, tolerance, min_delta):
+    # A phase regresses when it is both relatively and absolutely slower than the baseline
+    regressions = []
+    for name, results in report["results"].items():
+        for size_key, times in results.items():
+            old_times = baseline.get("results", {}).get(name, {}).get(size_key)
+            if old_times is None:
+                continue
+            for phase in PHASES:
+                old, new = old_times[phase], times[phase]
+                if new > old * (1 + tolerance) and new - old > min_delta:
+                    regressions.append((name, size_key, phase, old, new))
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against the baseline:")
+        for name, size_key, phase, old, new in regressions:
+            print(f"  {name} N={size_key} {phase}: {old*1000:.2f}ms -> {new*1000:.2f}ms ({new/old:.2f}x)")
+    else:
+        print("\nno regressions against the baseline")
+    return regressions
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Orion lexer/parser/interpreter benchmarks")
+    arg_parser.add_argument("benchmarks", nargs="*", metavar="benchmark", help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    arg_parser.add_argument("--engine", choices=list(ENGINES), default="tree")
+    arg_parser.add_argument("--lexer", choices=list(LEXERS), default="regex")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="runs per size, the fastest is kept (default: 3)")
+    arg_parser.add_argument("--max", type=int, default=100000, help="largest input size to run (default: 100000)")
+    arg_parser.add_argument("--json", metavar="PATH", help="write the results as JSON ('-' for stdout)")
+    arg_parser.add_argument("--baseline", metavar="PATH", default=BASELINE, help="baseline file (default: benchmarks/baseline.json)")
+    arg_parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    arg_parser.add_argument("--compare", action="store_true", help="exit 1 if any phase regressed against the baseline")
+    arg_parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before a phase counts as regressed (default: 0.25)")
+    arg_parser.add_argument("--min-delta", type=float, default=0.005, help="ignore slowdowns smaller than this many seconds (default: 0.005)")
+    args = arg_parser.parse_args()
+
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            arg_parser.error(f"unknown benchmark '{name}'")
+
+    report = {
+        "meta": {
+            "engine": args.engine,
+            "lexer": args.lexer,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": {},
+    }
+
+    workdir = tempfile.mkdtemp(prefix="orion-bench-")
+    try:
+        for name in args.benchmarks or BENCHMARKS:
+            report["results"][name] = {}
+            for size in BENCHMARKS[name][1]:
+                if size > args.max:
+                    continue
+                report["results"][name][str(size)] = run_benchmark(name, size, args.engine, args.lexer, args.repeat, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_table(report)
+        if args.json:
+            with open(args.json, "w") as file:
+                json.dump(report, file, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            sys.exit(f"no baseline at {args.baseline}, run with --save-baseline first")
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline.get("meta", {}).get("engine") != args.engine:
+            print(f"\nwarning: baseline was recorded with engine={baseline['meta'].get('engine')}")
+        if compare(report, baseline, args.tolerance, args.min_delta):
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Latency of one script run, cold (`orion script.or`) against warm (the
+thin client sending it to an `orion --serve` started for the benchmark).
+
+    python benchmarks/serve.py [script.or] [--runs N] [--engine vm]
+
+Without a script, benchmarks/programs/loop.or is run at N=1000: a job
+small enough that startup is most of its cost.
+
+Every run is a new process, as it is for a job runner: the cold column pays
+for Python startup, importing the interpreter and loading the stdlib, the
+warm column for Python startup and one round trip to the server.
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(ROOT, "src", "cli.py")
+CLIENT = os.path.join(ROOT, "src", "client.py")
+DEFAULT_TEMPLATE = os.path.join(ROOT, "benchmarks", "programs", "loop.or")
+DEFAULT_SIZE = 1000
+
+# How long to wait for the server's socket to appear
+START_TIMEOUT = 10
+
+def time_runs(command, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        times.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            sys.exit(f"{' '.join(command)} failed:\n{result.stderr.decode()}")
+    return times
+
+def start_server(socket_path, engine):
+    server = subprocess.Popen([sys.executable, CLI, "--serve", "--socket", socket_path, "--engine", engine], stderr=subprocess.DEVNULL)
+    deadline = time.perf_counter() + START_TIMEOUT
+    while not os.path.exists(socket_path):
+        if server.poll() is not None or time.perf_counter() > deadline:
+            server.kill()
+            sys.exit("the server did not start")
+        time.sleep(0.01)
+    return server
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Compare cold and warm (orion --serve) run latency.")
+    arg_parser.add_argument("script", nargs="?", help="script to run (default: the loop benchmark at N=1000)")
+    arg_parser.add_argument("--runs", type=int, default=20, help="runs of each kind (default: 20)")
+    arg_parser.add_argument("--engine", choices=["tree", "closure", "vm"], default="tree", help="execution engine (default: tree)")
+    args = arg_parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="orion-serve-")
+    socket_path = os.path.join(directory, "orion.sock")
+    if args.script is None:
+        with open(DEFAULT_TEMPLATE) as file:
+            source = file.read().replace("{N}", str(DEFAULT_SIZE))
+        args.script = os.path.join(directory, "loop.or")
+        with open(args.script, "w") as file:
+            file.write(source)
+    server = start_server(socket_path, args.engine)
+    try:
+        # One untimed run of each fills the parse cache, so both sides read it
+        time_runs([sys.executable, CLI, "--engine", args.engine, args.script], 1)
+        time_runs([sys.executable, CLIENT, "--socket", socket_path, args.script], 1)
+        cold = time_runs([sys.executable, CLI, "--engine", args.engine, args.script], args.runs)
+        warm = time_runs([sys.executable, CLIENT, "--socket", socket_path, args.script], args.runs)
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"{os.path.basename(args.script)}, {args.runs} runs, {args.engine} engine")
+    print(f"{'':<8}{'median ms':>12}{'min ms':>10}{'max ms':>10}")
+    for name, times in (("cold", cold), ("warm", warm)):
+        print(f"{name:<8}{statistics.median(times) * 1000:>12.2f}{min(times) * 1000:>10.2f}{max(times) * 1000:>10.2f}")
+    print(f"speedup {statistics.median(cold) / statistics.median(warm):.2f}x")
+
+if __name__ == '__main__':
+    main()
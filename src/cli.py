@@ -1,12 +1,54 @@
 import sys
-from main import run_file
+import argparse
+from main import run_file, profile_file, disassemble_file, dump_file, ENGINES, LEXERS, Profiler
+from repl import Repl
 
 def main():
-    if len(sys.argv) == 2:
-        run_file(sys.argv[1])
-        sys.exit(1)
+    arg_parser = argparse.ArgumentParser(prog="orion", usage="orion [options] [<script.or>]")
+    arg_parser.add_argument("script", nargs="?", help="path to the .or script to run (starts the REPL when left out)")
+    arg_parser.add_argument("--engine", choices=list(ENGINES), default="tree", help="execution engine (default: tree)")
+    arg_parser.add_argument("--vm", dest="engine", action="store_const", const="vm", help="shorthand for --engine vm")
+    arg_parser.add_argument("--lexer", choices=list(LEXERS), default="regex", help="lexer used to tokenize the script (default: regex)")
+    arg_parser.add_argument("--no-cache", dest="cache", action="store_false", help="do not read or write parsed trees in __orioncache__")
+    arg_parser.add_argument("-O", dest="optimize", action="store_true", help="fold constants and drop dead branches before running")
+    arg_parser.add_argument("--dis", action="store_true", help="print the script's bytecode instead of running it")
+    arg_parser.add_argument("--profile", action="store_true", help="run on the tree engine and print phase, function and node statistics")
+    arg_parser.add_argument("--profile-output", metavar="PATH", help="also save the profile, as pstats data for .prof/.pstats and JSON otherwise")
+    arg_parser.add_argument("--ast", action="store_true", help="print the script's tree instead of running it")
+    arg_parser.add_argument("--time", action="store_true", help="in the REPL, print how long each statement takes")
+    arg_parser.add_argument("--serve", action="store_true", help="run scripts sent by client.py on a warm interpreter until interrupted")
+    arg_parser.add_argument("--socket", metavar="PATH", help="Unix socket for --serve (default: $ORION_SOCKET, $XDG_RUNTIME_DIR/orion.sock or /tmp/orion-<uid>/orion.sock)")
+    args = arg_parser.parse_args()
+    if args.script is None and (args.dis or args.ast or args.profile):
+        arg_parser.error("--dis, --ast and --profile need a script")
+    if args.serve and args.script is not None:
+        arg_parser.error("--serve takes no script, send them with client.py")
+    if args.profile and args.engine != "tree":
+        arg_parser.error("--profile only works with the tree engine")
+
+    options = dict(lexer=args.lexer, cache=args.cache, optimize=args.optimize)
+    if args.serve:
+        from server import Server
+        Server(args.socket, engine=args.engine, **options).serve_forever()
+    elif args.script is None:
+        interpreter = ENGINES[args.engine]()
+        interpreter.use_cache = args.cache
+        interpreter.optimize = args.optimize
+        Repl(interpreter, lexer=args.lexer, optimize=args.optimize, timing=args.time).run()
+    elif args.dis:
+        print(disassemble_file(args.script, **options))
+    elif args.ast:
+        print(dump_file(args.script, **options))
+    elif args.profile:
+        # Reported even when the script fails or calls terminate()
+        profiler = Profiler(args.script)
+        try:
+            profile_file(args.script, profiler=profiler, **options)
+        finally:
+            print(profiler.summary(), file=sys.stderr)
+            if args.profile_output:
+                profiler.save(args.profile_output)
     else:
-        print("Usage: orion <script.or>")
-        sys.exit(1)
+        run_file(args.script, engine=args.engine, **options)
 
-main()
+main()
\ No newline at end of file
@@ -0,0 +1,91 @@
+"""
+Thin client for `orion --serve`: sends a script to the running server and
+prints what it printed, exiting with the script's exit status.
+
+    python src/client.py [--socket PATH] <script.or>
+
+Only the Python standard library is imported here, so a run costs Python
+startup plus one round trip instead of loading the interpreter.
+"""
+import os
+import sys
+import json
+import socket
+import struct
+
+# Frames are a kind byte, a payload length, then the payload
+FRAME_HEADER = struct.Struct("!cI")
+STDOUT = b"o"
+STDERR = b"e"
+EXIT = b"x"
+
+# Exit status when no server answered, so it cannot be mistaken for the script's own
+NO_SERVER = 3
+# Exit status when the server went away before the script finished
+LOST_SERVER = 4
+
+def default_socket_path():
+    # Somewhere only this user can reach: their runtime directory, else a 0700 directory the server makes in /tmp
+    if os.environ.get("ORION_SOCKET"):
+        return os.environ["ORION_SOCKET"]
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return os.path.join(os.environ["XDG_RUNTIME_DIR"], "orion.sock")
+    return os.path.join("/tmp", f"orion-{os.getuid()}", "orion.sock")
+
+def send_frame(sock, kind, data):
+    sock.sendall(FRAME_HEADER.pack(kind, len(data)) + data)
+
+def read_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 16))
+        if not chunk:
+            raise ConnectionError("server closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+def read_frames(sock):
+    while True:
+        kind, size = FRAME_HEADER.unpack(read_exact(sock, FRAME_HEADER.size))
+        yield kind, read_exact(sock, size)
+
+def run_remote(script, socket_path=None):
+    """Runs script on the server, copying its output to ours. Returns its exit status."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path or default_socket_path())
+    except OSError as error:
+        sock.close()
+        print(f"orion: no server at {socket_path or default_socket_path()} ({error.strerror}), start one with `orion --serve`", file=sys.stderr)
+        return NO_SERVER
+
+    with sock:
+        request = {"script": os.path.abspath(script), "cwd": os.getcwd()}
+        try:
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            for kind, data in read_frames(sock):
+                if kind == STDOUT:
+                    sys.stdout.buffer.write(data)
+                    sys.stdout.buffer.flush()
+                elif kind == STDERR:
+                    sys.stderr.buffer.write(data)
+                    sys.stderr.buffer.flush()
+                elif kind == EXIT:
+                    return int(data)
+        except ConnectionError:
+            print("orion: server closed the connection", file=sys.stderr)
+            return LOST_SERVER
+
+def main(argv):
+    socket_path = None
+    if len(argv) == 3 and argv[0] == "--socket":
+        socket_path = argv[1]
+        argv = argv[2:]
+    if len(argv) != 1:
+        print("usage: client.py [--socket PATH] <script.or>", file=sys.stderr)
+        return 2
+    return run_remote(argv[0], socket_path)
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
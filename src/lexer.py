@@ -1,9 +1,10 @@
-from dataclasses import dataclass
+import re
+from dataclasses import dataclass, field
 from enum import Enum
 
 WHITESPACE = ' \n\t'
 DIGITS = '0123456789.'
-KEYWORDS = ["var", "if", "else", "while", "for", "end", "return", "fn", "Nothing", "array", "import", "as"]
+KEYWORDS = ["var", "if", "else", "while", "for", "end", "return", "fn", "Nothing", "array", "import", "as", "break", "continue", "in"]
 LETTERS_LOWER = 'abcdefghijklmnopqrstuvwxyz'
 IDENTIFIERS_CHARS = '01234567890abcdefghijklmnopqrstuvwxyz_ABCDEFGHIJKLMNOPQRSTUVWXYZ'
 RESERVED_SYMBOLS = '"''=\\;,.<>=^():+-*/!^%[]}{'
@@ -65,10 +66,64 @@ class TokenType(Enum):
     IMPORT = 44
     AS = 45
 
-@dataclass
+    BREAK = 46
+    CONTINUE = 47
+    IN = 48
+
+KEYWORD_TYPES = {
+    "var": TokenType.VAR,
+    "array": TokenType.ARRAY,
+    "if": TokenType.IF,
+    "else": TokenType.ELSE,
+    "while": TokenType.WHILE,
+    "for": TokenType.FOR,
+    "return": TokenType.RETURN,
+    "end": TokenType.END,
+    "fn": TokenType.FUNC,
+    "Nothing": TokenType.NOTHING,
+    "import": TokenType.IMPORT,
+    "as": TokenType.AS,
+    "break": TokenType.BREAK,
+    "continue": TokenType.CONTINUE,
+    "in": TokenType.IN,
+}
+
+SYMBOL_TYPES = {
+    "+": TokenType.PLUS,
+    "++": TokenType.PLUSPLUS,
+    "-": TokenType.MINUS,
+    "--": TokenType.MINUSMINUS,
+    "*": TokenType.MUL,
+    "/": TokenType.DIV,
+    "(": TokenType.LPAREN,
+    ")": TokenType.RPAREN,
+    ",": TokenType.COMMA,
+    "{": TokenType.LBRACE,
+    "}": TokenType.RBRACE,
+    "[": TokenType.LBRACKET,
+    "]": TokenType.RBRACKET,
+    ";": TokenType.SEMICOLON,
+    ":": TokenType.COLON,
+    ".": TokenType.DOT,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQEQ,
+    "<": TokenType.LT,
+    "<=": TokenType.LTEQ,
+    ">": TokenType.GT,
+    ">=": TokenType.GTEQ,
+    "!": TokenType.NOT,
+    "!=": TokenType.NOTEQ,
+    "&&": TokenType.AND,
+    "||": TokenType.OR,
+}
+
+@dataclass(slots=True)
 class Token:
     type: TokenType
     value: any = None
+    # Source position (1-based), filled in by RegexLexer
+    line: int = field(default=None, compare=False)
+    column: int = field(default=None, compare=False)
 
     def __repr__(self):
         return f"{self.type.name}: {self.value}"
@@ -373,32 +428,96 @@ class Lexer:
             self.advance()
         
         # KEYWORDS > BOOLEAN > IDENTIFIER
-        if current_word in KEYWORDS:
-            if current_word == 'var':
-                return self.generate_keyword(TokenType.VAR, current_word)
-            elif current_word == 'array':
-                return self.generate_keyword(TokenType.ARRAY, current_word)
-            elif current_word == 'if':
-                return self.generate_keyword(TokenType.IF, current_word)
-            elif current_word == 'else':
-                return self.generate_keyword(TokenType.ELSE, current_word)
-            elif current_word == 'while':
-                return self.generate_keyword(TokenType.WHILE, current_word)
-            elif current_word == 'for':
-                return self.generate_keyword(TokenType.FOR, current_word)
-            elif current_word == 'return':
-                return self.generate_keyword(TokenType.RETURN, current_word)
-            elif current_word == 'end':
-                return self.generate_keyword(TokenType.END, current_word)
-            elif current_word == 'fn':
-                return self.generate_keyword(TokenType.FUNC, current_word)
-            elif current_word == 'Nothing':
-                return self.generate_keyword(TokenType.NOTHING, current_word)
-            elif current_word == 'import':
-                return self.generate_keyword(TokenType.IMPORT, current_word)
-            elif current_word == 'as':
-                return self.generate_keyword(TokenType.AS, current_word)
+        if current_word in KEYWORD_TYPES:
+            return self.generate_keyword(KEYWORD_TYPES[current_word], current_word)
         elif current_word in ("True", "False"):
             return self.generate_bool(current_word)
         else:
-            return self.generate_identifier(current_word)
\ No newline at end of file
+            return self.generate_identifier(current_word)
+
+# Alternatives are tried in order, mirroring the branch order of Lexer.generate_tokens.
+# A comment runs to a newline or to a closing '//'; a lone '/' inside it also
+# swallows the character after it, exactly as Lexer.skip_comments does.
+TOKEN_PATTERN = re.compile(r"""
+    (?P<WHITESPACE>[ \n\t]+)
+  | (?P<NUMBER>\d[0-9.]*|\.[0-9.]+)
+  | (?P<COMMENT>//(?:[^/\n]|/[^/])*(?:\n|//|/?\Z))
+  | (?P<TRAILING_SLASH>/\Z)
+  | (?P<SYMBOL>\+\+|--|==|<=|>=|!=|&&|\|\||[-+*/(),{}\[\];:=<>!.])
+  | (?P<STRING>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<OPEN_STRING>["'])
+  | (?P<TERM>[A-Za-z_][^"=\\;,.<>^():+\-*/!%\[\]{} \n\t]*)
+  | (?P<HALF_OPERATOR>[&|])
+  | (?P<INVALID>.)
+""", re.VERBOSE | re.DOTALL)
+ESCAPE_PATTERN = re.compile(r"\\(.)", re.DOTALL)
+ESCAPES = {'n': '\n', 't': '\t', 'b': '\b', '"': '"', "'": "'", '\\': '\\'}
+
+def replace_escape(match):
+    # Unknown escapes are dropped, as in Lexer.generate_string
+    return ESCAPES.get(match.group(1), '')
+
+class RegexLexer:
+    """
+    Index-based lexer producing the same Token stream as Lexer.
+
+    The source is scanned with one compiled master pattern instead of one
+    iterator call per character, and every token records its line and column.
+    """
+    def __init__(self, text):
+        self.text = text
+
+    def raise_error(self, message):
+        raise Exception(f"{message}")
+
+    def generate_tokens(self):
+        keyword_types = KEYWORD_TYPES
+        symbol_types = SYMBOL_TYPES
+        line = 1
+        line_start = 0
+
+        for match in TOKEN_PATTERN.finditer(self.text):
+            kind = match.lastgroup
+            value = match.group()
+
+            if kind == 'TERM':
+                if value in keyword_types:
+                    yield Token(keyword_types[value], value, line, match.start() - line_start + 1)
+                elif value == "True" or value == "False":
+                    yield Token(TokenType.BOOL, value == "True", line, match.start() - line_start + 1)
+                else:
+                    yield Token(TokenType.IDENTIFIER, value, line, match.start() - line_start + 1)
+            elif kind == 'SYMBOL':
+                yield Token(symbol_types[value], value, line, match.start() - line_start + 1)
+            elif kind == 'WHITESPACE' or kind == 'COMMENT':
+                newlines = value.count('\n')
+                if newlines:
+                    line += newlines
+                    line_start = match.start() + value.rindex('\n') + 1
+            elif kind == 'NUMBER':
+                yield Token(*self.generate_number(value), line, match.start() - line_start + 1)
+            elif kind == 'STRING':
+                string = value[1:-1]
+                if '\\' in string:
+                    string = ESCAPE_PATTERN.sub(replace_escape, string)
+                yield Token(TokenType.STRING, string, line, match.start() - line_start + 1)
+                newlines = value.count('\n')
+                if newlines:
+                    line += newlines
+                    line_start = match.start() + value.rindex('\n') + 1
+            elif kind == 'OPEN_STRING':
+                self.raise_error(f"Expected ({value}), got (None)")
+            elif kind == 'TRAILING_SLASH':
+                self.raise_error(f"None is not recognised. Did you mean '//'")
+            elif kind == 'HALF_OPERATOR':
+                self.raise_error("Invalid Token")
+            else:
+                self.raise_error(r"Invalid syntax")
+
+    def generate_number(self, value):
+        dp_count = value.count('.')
+        if dp_count > 1:
+            self.raise_error(r"Too many decimal points")
+        elif dp_count == 1:
+            return TokenType.FLOAT, float(value)
+        return TokenType.INT, int(value)
\ No newline at end of file
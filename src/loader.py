@@ -0,0 +1,100 @@
+import os
+import sys
+import pickle
+import hashlib
+from lexer import Lexer, RegexLexer
+from parser import Parser
+
+LEXERS = {
+    "regex": RegexLexer,
+    "scan": Lexer,
+}
+
+CACHE_DIR = "__orioncache__"
+CACHE_SUFFIX = ".orc"
+KEY_LENGTH = 16
+
+# Set ORION_NO_CACHE to disable the parse cache without touching the command line
+CACHE_ENABLED = not os.environ.get("ORION_NO_CACHE")
+
+def front_end_fingerprint():
+    # A cached tree is only valid for the modules that produced it, including
+    # the runtime values the parser puts in it (literal values, typecodes)
+    digest = hashlib.sha256(sys.version.encode())
+    for module_name in ("lexer", "parser", "tree", "runtime.values_", "runtime.operations"):
+        module = sys.modules.get(module_name)
+        if module is not None and getattr(module, '__file__', None):
+            with open(module.__file__, 'rb') as file:
+                digest.update(file.read())
+    return digest.hexdigest()
+
+FINGERPRINT = None
+
+def cache_key(source):
+    global FINGERPRINT
+    if FINGERPRINT is None:
+        FINGERPRINT = front_end_fingerprint()
+    return hashlib.sha256((FINGERPRINT + source).encode()).hexdigest()
+
+def cache_path(file_path, key):
+    directory, filename = os.path.split(os.path.abspath(file_path))
+    name = os.path.splitext(filename)[0]
+    return os.path.join(directory, CACHE_DIR, f"{name}.{key[:KEY_LENGTH]}{CACHE_SUFFIX}")
+
+def read_cache(path, key):
+    try:
+        with open(path, 'rb') as file:
+            cached_key, tree = pickle.load(file)
+    except Exception:
+        return None
+    if cached_key != key:
+        return None
+    return tree
+
+def write_cache(path, key, tree):
+    directory = os.path.dirname(path)
+    filename = os.path.basename(path)
+    name_length = len(filename) - len(CACHE_SUFFIX) - KEY_LENGTH
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(temp_path, 'wb') as file:
+            pickle.dump((key, tree), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+        # Drop entries left behind by older versions of the same file
+        for entry in os.listdir(directory):
+            if entry != filename and len(entry) == len(filename) and entry[:name_length] == filename[:name_length] and entry.endswith(CACHE_SUFFIX):
+                os.remove(os.path.join(directory, entry))
+    except (OSError, pickle.PicklingError, RecursionError):
+        # An unwritable directory or an unpicklable tree only costs a cache miss
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+def parse_source(source, lexer="regex"):
+    if lexer not in LEXERS:
+        raise Exception(f"unknown lexer '{lexer}'")
+
+    tokens = list(LEXERS[lexer](source).generate_tokens())
+    return Parser(tokens).parse()
+
+def load_tree(source, file_path=None, lexer="regex", cache=True):
+    """
+    Parses source, reusing the tree cached for file_path when possible.
+
+    Trees are stored unresolved in __orioncache__ next to the source file,
+    keyed by a hash of the source text and of the front end that parsed it,
+    so editing the script or upgrading the interpreter invalidates them.
+    """
+    if not (cache and CACHE_ENABLED and file_path):
+        return parse_source(source, lexer)
+
+    key = cache_key(source)
+    path = cache_path(file_path, key)
+    tree = read_cache(path, key)
+    if tree is None:
+        tree = parse_source(source, lexer)
+        write_cache(path, key, tree)
+    return tree
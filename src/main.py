@@ -1,29 +1,109 @@
+import os
+import sys
 import time
-from lexer import Lexer
+from loader import LEXERS, load_tree
 from parser import Parser
+from resolver import Resolver
+from optimizer import Optimizer
 from runtime.interpreter import Interpreter
+from runtime.closure_compiler import ClosureInterpreter
+from runtime.vm import VMInterpreter
+from runtime.profiler import Profiler, ProfilingInterpreter, PROFILING_STACK_FACTOR
+from runtime.bytecode import Compiler, disassemble
+from runtime.modules.io import close_open_files
 
 current_ver = "0.1.0"
 start_time = time.perf_counter()
 
-def run_file(file_path):
+ENGINES = {
+    "tree": Interpreter,
+    "closure": ClosureInterpreter,
+    "vm": VMInterpreter,
+}
+
+def parse_file(file_path, lexer="regex", cache=True):
     try:
         with open(file_path, 'r') as file:
             content = file.read()
-            
-        lexer = Lexer(content)
-        tokens = list(lexer.generate_tokens())
-        # print(tokens)
-        parser = Parser(tokens)
-        tree = parser.parse()
-        # print(tree)
-
-        interpreter = Interpreter()
+    except FileNotFoundError:
+        raise Exception('file does not exist')
+
+    return load_tree(content, file_path, lexer, cache)
+
+def build_tree(file_path, lexer="regex", cache=True, optimize=False):
+    tree = parse_file(file_path, lexer, cache)
+    if optimize:
+        Optimizer().optimize(tree)
+    return tree
+
+def run_file(file_path, engine="tree", lexer="regex", cache=True, optimize=False, interpreter=None):
+    if engine not in ENGINES:
+        raise Exception(f"unknown engine '{engine}'")
+
+    tree = build_tree(file_path, lexer, cache, optimize)
+    Resolver().resolve(tree)
+    # print(tree)
+
+    # The server passes in an interpreter it built (and loaded the stdlib into) ahead of time
+    if interpreter is None:
+        interpreter = ENGINES[engine]()
+    interpreter.use_cache = cache
+    interpreter.optimize = optimize
+    interpreter.modules.add_search_dir(os.path.dirname(os.path.abspath(file_path)))
+    try:
         interpreter.interpret(tree)
-        # print(interpreter.env.scopes)
+    finally:
+        # Whatever the script wrote to files it never closed still reaches them
+        close_open_files()
+    # print(interpreter.env.scopes)
+
+def profile_file(file_path, lexer="regex", cache=True, optimize=False, profiler=None):
+    # Lexes and parses without the cache so both phases are measured
+    if lexer not in LEXERS:
+        raise Exception(f"unknown lexer '{lexer}'")
+    try:
+        with open(file_path, 'r') as file:
+            content = file.read()
     except FileNotFoundError:
         raise Exception('file does not exist')
 
+    if profiler is None:
+        profiler = Profiler(file_path)
+    start = time.perf_counter()
+    tokens = list(LEXERS[lexer](content).generate_tokens())
+    profiler.phase("lex", start)
+
+    start = time.perf_counter()
+    tree = Parser(tokens).parse()
+    if optimize:
+        Optimizer().optimize(tree)
+    Resolver().resolve(tree)
+    profiler.phase("parse", start)
+
+    interpreter = ProfilingInterpreter(profiler)
+    interpreter.use_cache = cache
+    interpreter.optimize = optimize
+    interpreter.modules.add_search_dir(os.path.dirname(os.path.abspath(file_path)))
+    # A script deep enough to run unprofiled still has room for the frames timing adds
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(limit * PROFILING_STACK_FACTOR)
+    start = time.perf_counter()
+    try:
+        interpreter.interpret(tree)
+    finally:
+        profiler.phase("execute", start)
+        sys.setrecursionlimit(limit)
+        close_open_files()
+    return profiler
+
+def disassemble_file(file_path, lexer="regex", cache=True, optimize=False):
+    code = Compiler().compile(build_tree(file_path, lexer, cache, optimize))
+    return disassemble(code)
+
+def dump_file(file_path, lexer="regex", cache=True, optimize=False):
+    tree = build_tree(file_path, lexer, cache, optimize)
+    return "\n".join(repr(stmt) for stmt in tree.body)
+
 if __name__ == '__main__':
     pass
 
@@ -0,0 +1,185 @@
+from lexer import TokenType
+from tree import *
+from runtime.values_ import NOTHING
+from runtime.operations import BINARY_OPS, UNARY_OPS
+
+class Optimizer:
+    """
+    Optional tree-to-tree pass run between Parser.parse and Resolver.resolve.
+
+    Literals become ConstantNodes holding one shared value, operators whose
+    operands are all constant are folded by calling the same functions the
+    engines use at runtime, and if/while/for statements whose condition is
+    decided at compile time lose their dead branch. Statements that can
+    never run (after a return) or that do nothing (a lone constant) are
+    dropped. Anything that would raise at runtime is left for the runtime.
+    """
+    def optimize(self, tree):
+        tree.body = self.optimize_body(tree.body)
+        return tree
+
+    def visit(self, node):
+        method_name = f'optimize_{node.__class__.__name__}'
+        method = getattr(self, method_name, self.no_optimize_method)
+        return method(node)
+
+    def no_optimize_method(self, node):
+        return node
+
+    def optimize_body(self, statements):
+        body = []
+        for stmt in statements or []:
+            stmt = self.visit(stmt)
+            if stmt is None or isinstance(stmt, ConstantNode):
+                continue
+            body.append(stmt)
+            if isinstance(stmt, (ReturnNode, BreakNode, ContinueNode)):
+                break
+        return body
+
+    def block(self, statements):
+        # Branch bodies keep their own scope, so they are not spliced into the parent
+        if not statements:
+            return None
+        return BlockNode(statements)
+
+    # STATEMENTS
+    def optimize_VarDeclNode(self, node):
+        node.value = self.visit(node.value)
+        return node
+
+    def optimize_AssignNode(self, node):
+        node.value = self.visit(node.value)
+        return node
+
+    def optimize_IfNode(self, node):
+        node.condition = self.visit(node.condition)
+        node.body = self.optimize_body(node.body)
+        if node.else_body:
+            node.else_body = self.optimize_body(node.else_body)
+
+        if isinstance(node.condition, ConstantNode):
+            if node.condition.value:
+                return self.block(node.body)
+            return self.block(node.else_body)
+        return node
+
+    def optimize_WhileNode(self, node):
+        node.condition = self.visit(node.condition)
+        node.body = self.optimize_body(node.body)
+
+        if isinstance(node.condition, ConstantNode) and not node.condition.value:
+            return None
+        return node
+
+    def optimize_ForNode(self, node):
+        node.init = self.visit(node.init)
+        node.condition = self.visit(node.condition)
+        node.increment = self.visit(node.increment)
+        node.body = self.optimize_body(node.body)
+
+        if isinstance(node.condition, ConstantNode) and not node.condition.value:
+            return self.block([node.init])
+        return node
+
+    def optimize_ForInNode(self, node):
+        node.iterable = self.visit(node.iterable)
+        node.body = self.optimize_body(node.body)
+        return node
+
+    def optimize_BlockNode(self, node):
+        return self.block(self.optimize_body(node.body))
+
+    def optimize_FunctionDefNode(self, node):
+        node.body = self.optimize_body(node.body)
+        return node
+
+    def optimize_ReturnNode(self, node):
+        node.value = self.visit(node.value)
+        return node
+
+    # EXPRESSIONS
+    def optimize_BinaryOpNode(self, node):
+        node.left = self.visit(node.left)
+        node.right = self.visit(node.right)
+        op = node.op.type
+
+        if not isinstance(node.left, ConstantNode):
+            return node
+        left = node.left.value
+
+        # AND/OR only need a constant left side to be decided
+        if op == TokenType.AND:
+            return node.right if left else ConstantNode(False)
+        elif op == TokenType.OR:
+            return ConstantNode(True) if left else node.right
+
+        operator = BINARY_OPS.get(op)
+        if operator is None or not isinstance(node.right, ConstantNode):
+            return node
+        try:
+            return ConstantNode(operator(left, node.right.value))
+        except Exception:
+            return node
+
+    def optimize_UnaryOpNode(self, node):
+        node.operand = self.visit(node.operand)
+        operator = UNARY_OPS.get(node.op.value)
+        if operator and isinstance(node.operand, ConstantNode):
+            return ConstantNode(operator(node.operand.value))
+        return node
+
+    def optimize_NotNode(self, node):
+        node.body = self.visit(node.body)
+        if isinstance(node.body, ConstantNode):
+            return ConstantNode(not node.body.value)
+        return node
+
+    def optimize_LiteralNode(self, node):
+        return ConstantNode(node.value)
+
+    def optimize_NothingLiteralNode(self, node):
+        if node.literal is None:
+            return ConstantNode(NOTHING)
+        return node
+
+    def optimize_ArrayNode(self, node):
+        node.elements = [self.visit(element) for element in node.elements]
+        return node
+
+    def optimize_MapNode(self, node):
+        node.keys = [self.visit(key) for key in node.keys]
+        node.values = [self.visit(value) for value in node.values]
+        return node
+
+    def optimize_IndexAccessNode(self, node):
+        node.array = self.visit(node.array)
+        node.index = self.visit(node.index)
+        return node
+
+    def optimize_SliceNode(self, node):
+        node.array = self.visit(node.array)
+        node.start = self.visit(node.start)
+        node.end = self.visit(node.end)
+        return node
+
+    def optimize_IndexAssignNode(self, node):
+        node.array = self.visit(node.array)
+        node.index = self.visit(node.index)
+        node.value = self.visit(node.value)
+        return node
+
+    def optimize_FunctionCallNode(self, node):
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+    def optimize_MethodCallNode(self, node):
+        node.object_expr = self.visit(node.object_expr)
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+    def optimize_AttributeAccessNode(self, node):
+        node.obj = self.visit(node.obj)
+        if isinstance(node.attr, FunctionCallNode):
+            self.visit(node.attr)
+        return node
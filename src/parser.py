@@ -1,5 +1,7 @@
 from lexer import TokenType, Token
 from tree import *
+from runtime.operations import literal_value
+from runtime.values_ import ARRAY_TYPECODES
 
 class Parser:
     def __init__(self, tokens):
@@ -75,6 +77,12 @@ class Parser:
             return self.parse_function_def()
         elif token.type == TokenType.RETURN:
             return self.parse_return_statement()
+        elif token.type == TokenType.BREAK:
+            self.advance()
+            return BreakNode()
+        elif token.type == TokenType.CONTINUE:
+            self.advance()
+            return ContinueNode()
         elif token.type == TokenType.IMPORT:
             return self.parse_import_statement()
         else:
@@ -99,6 +107,8 @@ class Parser:
             self.advance()
             if isinstance(identifier, IndexAccessNode):
                 return IndexAssignNode(identifier.array, identifier.index, self.parse_expr())
+            if isinstance(identifier, SliceNode):
+                self.raise_error("Cannot assign to a slice")
             return AssignNode(getattr(identifier, 'value', identifier), self.parse_expr())
 
     def parse_var_decl(self):
@@ -136,8 +146,31 @@ class Parser:
             else:
                 self.raise_error_expect("]", self.current_token)
 
+    def parse_map(self):
+        keys, values = [], []
+        self.advance()
+        while self.current_token and self.current_token.type != TokenType.RBRACE:
+            keys.append(self.parse_expr())
+            if not self.current_token or self.current_token.type != TokenType.COLON:
+                self.raise_error_expect(":", self.current_token)
+            self.advance()
+            values.append(self.parse_expr())
+            if self.current_token and self.current_token.type == TokenType.COMMA:
+                self.advance()
+            elif not self.current_token or self.current_token.type != TokenType.RBRACE:
+                self.raise_error_expect("}", self.current_token)
+        if not self.current_token:
+            self.raise_error_expect("}", self.current_token)
+        self.advance()
+        return MapNode(keys, values)
+
     def parse_array_decl(self):
         self.advance()
+        kind = None
+        # `array int xs = [...]` / `array float xs = [...]` declare a packed numeric array
+        if self.current_token and self.current_token.value in ARRAY_TYPECODES and self.peek() and self.peek().type == TokenType.IDENTIFIER:
+            kind = self.current_token.value
+            self.advance()
         if self.current_token and self.current_token.type == TokenType.IDENTIFIER:
             identifier = self.current_token.value
             self.advance()
@@ -145,7 +178,7 @@ class Parser:
                 self.advance()
                 if self.current_token and self.current_token.type == TokenType.LBRACKET:
                     elements = self.parse_array()
-                    return VarDeclNode(identifier, ArrayNode(elements))
+                    return VarDeclNode(identifier, ArrayNode(elements, kind))
                 else:
                     self.raise_error_expect("[", self.current_token)
             else:
@@ -157,12 +190,29 @@ class Parser:
         node = self.parse_primary()
         while self.current_token and self.current_token.type == TokenType.LBRACKET:
             self.advance()
-            index = self.parse_expr()
-            if self.current_token and self.current_token.type == TokenType.RBRACKET:
+            # Either bound of a[start:end] can be left out
+            if self.current_token and self.current_token.type == TokenType.COLON:
+                index = NothingLiteralNode(None)
+            else:
+                index = self.parse_expr()
+            if self.current_token and self.current_token.type == TokenType.COLON:
+                self.advance()
+                if self.current_token and self.current_token.type == TokenType.RBRACKET:
+                    end = NothingLiteralNode(None)
+                else:
+                    end = self.parse_expr()
+                if self.current_token and self.current_token.type == TokenType.RBRACKET:
+                    self.advance()
+                    node = SliceNode(node, index, end)
+                else:
+                    self.raise_error_expect("]", self.current_token)
+            elif self.current_token and self.current_token.type == TokenType.RBRACKET:
                 self.advance()
                 node = IndexAccessNode(node, index)
             else:
                 self.raise_error_expect("]", self.current_token)
+        if isinstance(node, (IndexAccessNode, SliceNode)) and self.current_token and self.current_token.type == TokenType.DOT:
+            return self.parse_attribute_chain(node)
         return node
     
     def parse_primary(self):
@@ -172,7 +222,7 @@ class Parser:
             return VariableNode(token.value)
         elif token.type in (TokenType.INT, TokenType.FLOAT, TokenType.STRING, TokenType.BOOL):
             self.advance()
-            return LiteralNode(token)
+            return LiteralNode(token, literal_value(token))
         elif token.type == TokenType.NOTHING:
             self.advance()
             return NothingLiteralNode(None)
@@ -263,12 +313,12 @@ class Parser:
         if self.current_token and self.peek_prev_token() and self.peek_prev_token().type == TokenType.LPAREN:
             try:
                 args = []
-                if self.current_token and self.current_token.type in (TokenType.IDENTIFIER, TokenType.STRING, TokenType.INT, TokenType.FLOAT, TokenType.BOOL, TokenType.LBRACKET, TokenType.LPAREN, TokenType.NOTHING, TokenType.NOT):
+                if self.current_token and self.current_token.type in (TokenType.IDENTIFIER, TokenType.STRING, TokenType.INT, TokenType.FLOAT, TokenType.BOOL, TokenType.LBRACKET, TokenType.LBRACE, TokenType.LPAREN, TokenType.NOTHING, TokenType.NOT, TokenType.MINUS, TokenType.PLUS):
                     args.append(self.parse_expr())
                     while self.current_token and self.current_token.type == TokenType.COMMA:
                         if self.current_token and self.current_token.type == TokenType.COMMA:
                             self.advance()
-                            if self.current_token and self.current_token.type not in (TokenType.IDENTIFIER, TokenType.STRING, TokenType.INT, TokenType.FLOAT, TokenType.BOOL, TokenType.LBRACKET, TokenType.LPAREN, TokenType.NOTHING):
+                            if self.current_token and self.current_token.type not in (TokenType.IDENTIFIER, TokenType.STRING, TokenType.INT, TokenType.FLOAT, TokenType.BOOL, TokenType.LBRACKET, TokenType.LBRACE, TokenType.LPAREN, TokenType.NOTHING, TokenType.MINUS, TokenType.PLUS):
                                return "error"
                         if self.current_token and self.current_token.type != TokenType.COMMA:
                             args.append(self.parse_expr())
@@ -279,6 +329,7 @@ class Parser:
             self.raise_error_expect("(", self.current_token)
 
     def parse_function_def(self):
+        line = self.current_token.line
         self.advance()
         name = None
         params = []
@@ -323,7 +374,7 @@ class Parser:
         else:
             self.raise_error("Expected function identifier")
 
-        return FunctionDefNode(name, params, body)
+        return FunctionDefNode(name, params, body, line=line)
     
     def parse_parameters(self):
         if self.current_token and self.peek_prev_token() and self.peek_prev_token().type == TokenType.LPAREN:
@@ -432,6 +483,8 @@ class Parser:
                         body.append(stmt)
                     if self.current_token.type == TokenType.SEMICOLON:
                         self.advance()
+                    elif self.peek_prev_token() and self.peek_prev_token().type == TokenType.END:
+                        continue
                     else:
                         self.raise_error_expect(";")
                 if self.current_token and self.current_token.type == TokenType.END:
@@ -446,6 +499,8 @@ class Parser:
 
     def parse_for_statement(self):
         self.advance()
+        if self.current_token and self.current_token.type == TokenType.IDENTIFIER and self.peek() and self.peek().type == TokenType.IN:
+            return self.parse_for_in_statement()
         if self.current_token and self.current_token.type == TokenType.LPAREN:
             self.advance()
             if self.current_token and self.current_token.type == TokenType.VAR:
@@ -488,7 +543,7 @@ class Parser:
                                 # RPAREN
                                 if self.current_token and self.current_token.type == TokenType.RPAREN:
                                     self.advance()
-                                    unopchange = AssignNode(identifier.value, BinaryOpNode(VariableNode(f"{identifier.value}"), Token(TokenType.PLUS, "+"), LiteralNode(Token(TokenType.INT, 1))))
+                                    unopchange = AssignNode(identifier.value, BinaryOpNode(VariableNode(f"{identifier.value}"), Token(TokenType.PLUS, "+"), LiteralNode(Token(TokenType.INT, 1), literal_value(Token(TokenType.INT, 1)))))
                                 else:
                                     self.raise_error_expect(")")
                             else:
@@ -503,8 +558,17 @@ class Parser:
                 self.raise_error_expect("var")
         else:
             self.raise_error_expect(")")
-        
-        # BODY
+
+        return ForNode(init, condition, unopchange, self.parse_loop_body())
+
+    def parse_for_in_statement(self):
+        identifier = self.current_token.value
+        self.advance()
+        self.advance()
+        iterable = self.parse_expr()
+        return ForInNode(identifier, iterable, self.parse_loop_body())
+
+    def parse_loop_body(self):
         if self.current_token.type == TokenType.COLON:
             self.advance()
             body = []
@@ -526,8 +590,7 @@ class Parser:
                 self.raise_error_expect("end")
         else:
             self.raise_error_expect(":")
-
-        return ForNode(init, condition, unopchange, body)
+        return body
     
     def parse_logical_or(self):
         left = self.parse_logical_and()
@@ -601,6 +664,8 @@ class Parser:
         elif token.type == TokenType.LBRACKET:
             array = self.parse_array()
             return ArrayNode(array)
+        elif token.type == TokenType.LBRACE:
+            return self.parse_map()
         elif token.type == TokenType.IDENTIFIER:
             if self.peek() and self.peek().type == TokenType.LPAREN:
                 return self.parse_function_call()
@@ -612,7 +677,7 @@ class Parser:
                 return self.parse_index_access()  # handles simple var or chained array access
         elif token.type in (TokenType.INT, TokenType.FLOAT, TokenType.STRING, TokenType.BOOL):
             self.advance()
-            return LiteralNode(token)
+            return LiteralNode(token, literal_value(token))
         elif token.type == TokenType.NOTHING:
             self.advance()
             return NothingLiteralNode(None)
@@ -622,7 +687,9 @@ class Parser:
     def parse_attribute(self):
         obj = VariableNode(self.current_token.value)
         self.advance()
-        
+        return self.parse_attribute_chain(obj)
+
+    def parse_attribute_chain(self, obj):
         while self.current_token and self.current_token.type == TokenType.DOT:
             self.advance()
             
@@ -0,0 +1,161 @@
+import sys
+import time
+from lexer import TokenType
+from loader import LEXERS, parse_source
+from resolver import Resolver
+from optimizer import Optimizer
+from tree import VarDeclNode, FunctionDefNode, ImportNode, FunctionCallNode, MethodCallNode, AttributeAccessNode, ReturnNode
+from runtime.values_ import NothingValue
+from runtime.modules.io import close_open_files
+
+try:
+    import readline # line editing and history, where the platform has it
+except ImportError:
+    readline = None
+
+PROMPT = ">>> "
+CONTINUE_PROMPT = "... "
+
+# Statements whose value is printed back, like a calculator
+ECHOED_NODES = (FunctionCallNode, MethodCallNode, AttributeAccessNode)
+
+HELP = """Enter Orion statements; blocks (fn, if, while, for) run once their `end` is entered.
+A missing `;` at the end of a statement is added for you.
+  :time    print how long each statement takes to parse and run
+  :quit    leave (so does Ctrl-D)"""
+
+def block_depth(tokens):
+    # How many fn/if/while/for blocks are still waiting for their `end`
+    depth = 0
+    previous = None
+    for token in tokens:
+        if token.type in (TokenType.FUNC, TokenType.WHILE, TokenType.FOR):
+            depth += 1
+        elif token.type == TokenType.IF and (previous is None or previous.type != TokenType.ELSE):
+            depth += 1
+        elif token.type == TokenType.END:
+            depth -= 1
+        previous = token
+    return depth
+
+class Repl:
+    """
+    Reads statements from a terminal and runs them on one interpreter, so
+    variables, functions and imported modules carry over from one entry
+    to the next. Only the newly entered text is lexed, parsed and resolved;
+    top-level names stay globals in the interpreter's Environment, which is
+    how later entries find them.
+    """
+    def __init__(self, interpreter, lexer="regex", optimize=False, timing=False):
+        self.interpreter = interpreter
+        self.lexer = lexer
+        self.optimize = optimize
+        self.timing = timing
+        self.lines = []
+
+    def run(self):
+        print(f"Orion REPL ({self.interpreter.__class__.__name__}). Type :help for commands.")
+        while True:
+            try:
+                line = input(CONTINUE_PROMPT if self.lines else PROMPT)
+            except EOFError:
+                print()
+                return
+            except KeyboardInterrupt:
+                # Drops a half-entered block
+                print()
+                self.lines = []
+                continue
+            if not self.lines and line.strip().startswith(":"):
+                if self.command(line.strip()) is False:
+                    return
+                continue
+            self.feed(line)
+
+    def command(self, command):
+        if command in (":quit", ":exit", ":q"):
+            return False
+        elif command == ":time":
+            self.timing = not self.timing
+            print(f"timing {'on' if self.timing else 'off'}")
+        elif command == ":help":
+            print(HELP)
+        else:
+            print(f"Unknown command '{command}', try :help")
+
+    def feed(self, line):
+        """Adds a line of input and runs it once it completes a statement."""
+        self.lines.append(line)
+        source = "\n".join(self.lines)
+        try:
+            tokens = list(LEXERS[self.lexer](source).generate_tokens())
+        except Exception as error:
+            self.lines = []
+            self.report(error)
+            return
+        if not tokens:
+            self.lines = []
+            return
+        if block_depth(tokens) > 0:
+            return
+
+        self.lines = []
+        if tokens[-1].type not in (TokenType.SEMICOLON, TokenType.END):
+            source += "\n;"
+        self.execute(source)
+
+    def execute(self, source):
+        start = time.perf_counter()
+        try:
+            tree = parse_source(source, self.lexer)
+            echo = bool(tree.body) and isinstance(tree.body[-1], ECHOED_NODES)
+            if echo:
+                # A top-level return hands the value back from every engine
+                tree.body[-1] = ReturnNode(tree.body[-1])
+            if self.optimize:
+                Optimizer().optimize(tree)
+            Resolver().resolve(tree)
+        except Exception as error:
+            self.report(error)
+            return
+        parsed = time.perf_counter()
+
+        replaced = self.redeclare(tree)
+        result = None
+        try:
+            result = self.interpreter.interpret(tree)
+        except KeyboardInterrupt:
+            # Ctrl-C stops the statement, not the session
+            self.restore(replaced)
+            print("Interrupted", file=sys.stderr)
+        except Exception as error:
+            self.restore(replaced)
+            self.report(error)
+        # Files stay open for later entries, but what was written shows up on disk now
+        close_open_files(keep_open=True)
+        finished = time.perf_counter()
+
+        if echo and result is not None and not isinstance(result, NothingValue):
+            print(result)
+        if self.timing:
+            print(f"[parse {(parsed - start) * 1000:.3f} ms, run {(finished - parsed) * 1000:.3f} ms]", file=sys.stderr)
+
+    def redeclare(self, tree):
+        # Declaring a global again replaces it, so a function can be fixed and re-entered
+        scope = self.interpreter.env.scopes[-1]
+        replaced = {}
+        for stmt in tree.body:
+            if isinstance(stmt, (VarDeclNode, FunctionDefNode, ImportNode)):
+                name = getattr(stmt, 'identifier', None) or stmt.name
+                if name in scope:
+                    replaced[name] = scope.pop(name)
+        return replaced
+
+    def restore(self, replaced):
+        # A declaration that failed leaves the old value in place
+        scope = self.interpreter.env.scopes[-1]
+        for name, value in replaced.items():
+            scope.setdefault(name, value)
+
+    def report(self, error):
+        print(f"Error: {error}", file=sys.stderr)
@@ -0,0 +1,319 @@
+from tree import *
+from lexer import TokenType
+from runtime.values_ import IntValue
+import dataclasses
+
+# Comparisons a counted loop can stop on, with the step direction each one needs
+COUNTED_COMPARISONS = {
+    TokenType.LT: 1,
+    TokenType.LTEQ: 1,
+    TokenType.GT: -1,
+    TokenType.GTEQ: -1,
+}
+
+def int_constant(node):
+    value = getattr(node, 'value', None)
+    if isinstance(node, (LiteralNode, ConstantNode)) and value.__class__ is IntValue:
+        return value.value
+    return None
+
+def touches(node, identifier):
+    # True if anything under node can write identifier, or keep a frame alive past the loop
+    if isinstance(node, list):
+        return any(touches(item, identifier) for item in node)
+    if isinstance(node, FunctionDefNode):
+        return True
+    if isinstance(node, (AssignNode, PostfixOpNode, VarDeclNode, ForInNode)):
+        if getattr(node.identifier, 'identifier', node.identifier) == identifier:
+            return True
+    if not dataclasses.is_dataclass(node):
+        return False
+    return any(touches(getattr(node, field.name), identifier) for field in dataclasses.fields(node))
+
+class FunctionScope:
+    def __init__(self, parent=None, is_global=False):
+        self.parent = parent
+        self.blocks = [] if is_global else [{}]
+        self.nlocals = 0
+        self.has_inner_functions = False
+        self.loop_depth = 0
+        # (name, depth, slot) the function's own name resolves to from its body
+        self.self_reference = None
+
+class Resolver:
+    """
+    Static scope pass run between Parser.parse and Interpreter.interpret.
+
+    Every variable reference is annotated with a (depth, slot) pair: depth
+    is the number of function boundaries between the reference and the
+    declaration, slot is the declaration's index in that function's Frame.
+    Variables declared at the outermost level of a program are globals and
+    are left unresolved (slot None), so they keep being looked up by name
+    in the global Environment alongside builtins and imported modules.
+
+    Function bodies are resolved when the block defining them ends, so a
+    function can use any name its block declares, before or after it
+    (mutually recursive helpers, a variable declared after the function).
+    """
+    def __init__(self):
+        self.scope = None
+        # Functions defined in each open block, waiting for the block to end
+        self.deferred = []
+
+    def raise_error(self, message):
+        raise Exception(message)
+
+    def resolve(self, tree):
+        self.scope = FunctionScope(is_global=True)
+        self.deferred = [[]]
+        for stmt in tree.body:
+            self.visit(stmt)
+        self.resolve_deferred()
+        tree.nlocals = self.scope.nlocals
+        return tree
+
+    def visit(self, node):
+        method_name = f'resolve_{node.__class__.__name__}'
+        method = getattr(self, method_name, self.no_resolve_method)
+        return method(node)
+
+    def no_resolve_method(self, node):
+        raise Exception(f"No resolve_{type(node).__name__} method defined")
+
+    def visit_block(self, statements):
+        self.push_block()
+        for stmt in statements or []:
+            self.visit(stmt)
+        self.pop_block()
+
+    def push_block(self):
+        self.scope.blocks.append({})
+        self.deferred.append([])
+
+    def pop_block(self):
+        self.resolve_deferred()
+        self.scope.blocks.pop()
+
+    def resolve_deferred(self):
+        # Every name of the block is declared by now, whatever order the statements came in
+        for node in self.deferred.pop():
+            self.resolve_function_body(node)
+
+    def declare(self, identifier):
+        scope = self.scope
+        if not scope.blocks:
+            return None
+        block = scope.blocks[-1]
+        if identifier in block:
+            self.raise_error(f"'{identifier}' already exists")
+        block[identifier] = scope.nlocals
+        scope.nlocals += 1
+        return block[identifier]
+
+    def lookup(self, identifier):
+        scope = self.scope
+        depth = 0
+        while scope:
+            for block in reversed(scope.blocks):
+                if identifier in block:
+                    return depth, block[identifier]
+            scope = scope.parent
+            depth += 1
+        return None, None
+
+    # DECLARATIONS
+    def resolve_VarDeclNode(self, node):
+        self.visit(node.value)
+        node.slot = self.declare(node.identifier)
+
+    def resolve_FunctionDefNode(self, node):
+        node.slot = self.declare(node.name)
+        self.scope.has_inner_functions = True
+        self.deferred[-1].append(node)
+
+    def resolve_function_body(self, node):
+        self.scope = FunctionScope(parent=self.scope)
+        self.scope.self_reference = (node.name, None if node.slot is None else 1, node.slot)
+        self.deferred.append([])
+        for param in node.params:
+            param.slot = self.declare(param.params.identifier)
+        for stmt in node.body:
+            self.visit(stmt)
+        self.resolve_deferred()
+        node.nlocals = self.scope.nlocals
+        # A call frame can only outlive its call when an inner function captured it
+        node.reuse_frames = not self.scope.has_inner_functions
+        self.scope = self.scope.parent
+
+    def resolve_ImportNode(self, node):
+        node.slot = self.declare(node.name)
+
+    # REFERENCES
+    def resolve_VariableNode(self, node):
+        node.depth, node.slot = self.lookup(node.identifier)
+
+    def resolve_AssignNode(self, node):
+        self.visit(node.value)
+        identifier = getattr(node.identifier, 'identifier', node.identifier)
+        node.depth, node.slot = self.lookup(identifier)
+
+    def resolve_PostfixOpNode(self, node):
+        node.depth, node.slot = self.lookup(node.identifier)
+
+    def resolve_FunctionCallNode(self, node):
+        node.depth, node.slot = self.lookup(node.name.value)
+        for arg in node.args:
+            self.visit(arg)
+
+    # CONTROL FLOW
+    def resolve_IfNode(self, node):
+        self.visit(node.condition)
+        self.visit_block(node.body)
+        if node.else_body:
+            self.visit_block(node.else_body)
+
+    def resolve_BlockNode(self, node):
+        self.visit_block(node.body)
+
+    def resolve_WhileNode(self, node):
+        self.push_block()
+        self.visit(node.condition)
+        self.scope.loop_depth += 1
+        for stmt in node.body:
+            self.visit(stmt)
+        self.scope.loop_depth -= 1
+        self.pop_block()
+
+    def resolve_ForNode(self, node):
+        self.push_block()
+        self.visit(node.init)
+        self.visit(node.condition)
+        self.scope.loop_depth += 1
+        for stmt in node.body:
+            self.visit(stmt)
+        self.scope.loop_depth -= 1
+        self.visit(node.increment)
+        self.pop_block()
+        node.counted = self.counted_loop(node)
+
+    def counted_loop(self, node):
+        """
+        Recognizes `for (var i = start; i < limit; i++)`: a comparison of the
+        loop variable against a constant or a variable, stepped by a constant
+        the body never changes. Engines run these loops without evaluating
+        the condition and increment nodes each time round.
+        """
+        init, condition, increment = node.init, node.condition, node.increment
+        if not isinstance(init, VarDeclNode) or not isinstance(condition, BinaryOpNode):
+            return None
+        identifier = init.identifier
+        left = condition.left
+        if not isinstance(left, VariableNode) or (left.identifier, left.depth, left.slot) != (identifier, 0, init.slot):
+            return None
+        direction = COUNTED_COMPARISONS.get(condition.op.type)
+        if direction is None:
+            return None
+        limit = condition.right
+        if int_constant(limit) is None and not isinstance(limit, VariableNode):
+            return None
+
+        if isinstance(increment, PostfixOpNode) and increment.identifier == identifier:
+            step = 1 if increment.op.type == TokenType.PLUSPLUS else -1
+            kind = "step"
+        elif isinstance(increment, AssignNode) and getattr(increment.identifier, 'identifier', increment.identifier) == identifier:
+            value = increment.value
+            if not isinstance(value, BinaryOpNode) or not isinstance(value.left, VariableNode) or value.left.identifier != identifier:
+                return None
+            step = int_constant(value.right)
+            if step is None or value.op.type not in (TokenType.PLUS, TokenType.MINUS):
+                return None
+            kind = "add" if value.op.type == TokenType.PLUS else "sub"
+            if kind == "sub":
+                step = -step
+        else:
+            return None
+
+        if step * direction <= 0 or touches(node.body, identifier):
+            return None
+        # < and > stop at the limit, <= and >= one step past it
+        offset = {TokenType.LTEQ: 1, TokenType.GTEQ: -1}.get(condition.op.type, 0)
+        return (step, offset, kind)
+
+    def resolve_ForInNode(self, node):
+        self.visit(node.iterable)
+        self.push_block()
+        node.slot = self.declare(node.identifier)
+        self.scope.loop_depth += 1
+        for stmt in node.body:
+            self.visit(stmt)
+        self.scope.loop_depth -= 1
+        self.pop_block()
+
+    def resolve_ReturnNode(self, node):
+        self.visit(node.value)
+        # `return f(...)` inside f, with f not shadowed, can reuse the running call
+        value = node.value
+        if isinstance(value, FunctionCallNode) and (value.name.value, value.depth, value.slot) == self.scope.self_reference:
+            node.tail_call = True
+
+    def resolve_BreakNode(self, node):
+        if not self.scope.loop_depth:
+            self.raise_error("'break' outside loop")
+
+    def resolve_ContinueNode(self, node):
+        if not self.scope.loop_depth:
+            self.raise_error("'continue' outside loop")
+
+    # EXPRESSIONS
+    def resolve_BinaryOpNode(self, node):
+        self.visit(node.left)
+        self.visit(node.right)
+
+    def resolve_UnaryOpNode(self, node):
+        self.visit(node.operand)
+
+    def resolve_NotNode(self, node):
+        self.visit(node.body)
+
+    def resolve_ArrayNode(self, node):
+        for element in node.elements:
+            self.visit(element)
+
+    def resolve_MapNode(self, node):
+        for key, value in zip(node.keys, node.values):
+            self.visit(key)
+            self.visit(value)
+
+    def resolve_IndexAccessNode(self, node):
+        self.visit(node.array)
+        self.visit(node.index)
+
+    def resolve_SliceNode(self, node):
+        self.visit(node.array)
+        self.visit(node.start)
+        self.visit(node.end)
+
+    def resolve_IndexAssignNode(self, node):
+        self.visit(node.array)
+        self.visit(node.index)
+        self.visit(node.value)
+
+    def resolve_MethodCallNode(self, node):
+        self.visit(node.object_expr)
+        for arg in node.args:
+            self.visit(arg)
+
+    def resolve_AttributeAccessNode(self, node):
+        self.visit(node.obj)
+        if isinstance(node.attr, FunctionCallNode):
+            for arg in node.attr.args:
+                self.visit(arg)
+
+    def resolve_LiteralNode(self, node):
+        pass
+
+    def resolve_NothingLiteralNode(self, node):
+        pass
+
+    def resolve_ConstantNode(self, node):
+        pass
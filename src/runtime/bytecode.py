@@ -0,0 +1,461 @@
+from dataclasses import dataclass, field
+from lexer import TokenType
+from runtime.values_ import *
+from runtime.operations import *
+from tree import *
+from resolver import Resolver
+
+# OPCODES
+# Every instruction is two ints wide: [opcode, argument].
+LOAD_CONST = 0
+LOAD_LOCAL = 1
+STORE_LOCAL = 2
+LOAD_DEREF = 3
+STORE_DEREF = 4
+LOAD_GLOBAL = 5
+STORE_GLOBAL = 6
+DECLARE_GLOBAL = 7
+POP = 8
+DUP = 9
+BINARY_OP = 10
+UNARY_OP = 11
+NOT = 12
+STEP = 13
+JUMP = 14
+JUMP_IF_FALSE = 15
+AND_JUMP = 16
+OR_JUMP = 17
+BUILD_ARRAY = 18
+INDEX_GET = 19
+INDEX_SET = 20
+GET_ATTR = 21
+CALL = 22
+CALL_METHOD = 23
+MAKE_FUNCTION = 24
+RETURN = 25
+IMPORT = 26
+TAIL_CALL = 27
+PACK_ARRAY = 28
+SLICE = 29
+GET_METHOD = 30
+GET_ITER = 31
+FOR_ITER = 32
+COUNTED_ITER = 33
+BUILD_MAP = 34
+
+OPCODE_NAMES = {
+    LOAD_CONST: "LOAD_CONST",
+    LOAD_LOCAL: "LOAD_LOCAL",
+    STORE_LOCAL: "STORE_LOCAL",
+    LOAD_DEREF: "LOAD_DEREF",
+    STORE_DEREF: "STORE_DEREF",
+    LOAD_GLOBAL: "LOAD_GLOBAL",
+    STORE_GLOBAL: "STORE_GLOBAL",
+    DECLARE_GLOBAL: "DECLARE_GLOBAL",
+    POP: "POP",
+    DUP: "DUP",
+    BINARY_OP: "BINARY_OP",
+    UNARY_OP: "UNARY_OP",
+    NOT: "NOT",
+    STEP: "STEP",
+    JUMP: "JUMP",
+    JUMP_IF_FALSE: "JUMP_IF_FALSE",
+    AND_JUMP: "AND_JUMP",
+    OR_JUMP: "OR_JUMP",
+    BUILD_ARRAY: "BUILD_ARRAY",
+    INDEX_GET: "INDEX_GET",
+    INDEX_SET: "INDEX_SET",
+    GET_ATTR: "GET_ATTR",
+    CALL: "CALL",
+    CALL_METHOD: "CALL_METHOD",
+    MAKE_FUNCTION: "MAKE_FUNCTION",
+    RETURN: "RETURN",
+    IMPORT: "IMPORT",
+    TAIL_CALL: "TAIL_CALL",
+    PACK_ARRAY: "PACK_ARRAY",
+    SLICE: "SLICE",
+    GET_METHOD: "GET_METHOD",
+    GET_ITER: "GET_ITER",
+    FOR_ITER: "FOR_ITER",
+    COUNTED_ITER: "COUNTED_ITER",
+    BUILD_MAP: "BUILD_MAP",
+}
+
+BINARY_OPERATORS = list(BINARY_OPS.values())
+BINARY_OPERATOR_INDEX = {op_type: index for index, op_type in enumerate(BINARY_OPS)}
+UNARY_OPERATORS = list(UNARY_OPS.values())
+UNARY_OPERATOR_INDEX = {symbol: index for index, symbol in enumerate(UNARY_OPS)}
+
+DEREF_SHIFT = 16
+DEREF_MASK = (1 << DEREF_SHIFT) - 1
+METHOD_SHIFT = 8
+MAX_ARGS = (1 << METHOD_SHIFT) - 1
+
+# Nodes that leave nothing on the stack when compiled
+STATEMENT_NODES = (VarDeclNode, AssignNode, IfNode, WhileNode, ForNode, ForInNode, FunctionDefNode, ReturnNode, ImportNode, BlockNode, BreakNode, ContinueNode)
+
+@dataclass
+class CodeObject:
+    name: str
+    instructions: list
+    constants: list
+    names: list
+    nlocals: int = 0
+    nparams: int = 0
+
+    def __repr__(self):
+        return (f"<code {self.name}>")
+
+@dataclass
+class CodeBuilder:
+    name: str
+    parent: any = None
+    instructions: list = field(default_factory=list)
+    constants: list = field(default_factory=list)
+    names: list = field(default_factory=list)
+    nlocals: int = 0
+    nparams: int = 0
+    const_index: dict = field(default_factory=dict)
+    # One ([break jumps], [continue jumps]) pair per enclosing loop, patched when the loop ends
+    loops: list = field(default_factory=list)
+
+    def emit(self, op, arg=0):
+        self.instructions.append(op)
+        self.instructions.append(arg)
+        return len(self.instructions) - 2
+
+    def position(self):
+        return len(self.instructions)
+
+    def patch(self, at, target):
+        self.instructions[at + 1] = target
+
+    def add_const(self, value, key=None):
+        if key is not None and key in self.const_index:
+            return self.const_index[key]
+        self.constants.append(value)
+        index = len(self.constants) - 1
+        if key is not None:
+            self.const_index[key] = index
+        return index
+
+    def add_name(self, name):
+        if name not in self.names:
+            self.names.append(name)
+        return self.names.index(name)
+
+    def build(self):
+        return CodeObject(self.name, self.instructions, self.constants, self.names, self.nlocals, self.nparams)
+
+class Compiler:
+    """
+    Compiles a tree into a CodeObject for the stack VM in runtime/vm.py.
+
+    Variable slots come from the Resolver: globals (slot None) live in the
+    interpreter's Environment, locals in the frame's slot array, and
+    variables of an enclosing function are reached through LOAD_DEREF with
+    the resolved (depth, slot) pair.
+    """
+    def __init__(self):
+        self.builder = None
+
+    def raise_error(self, message):
+        raise Exception(message)
+
+    def compile(self, tree, name="<program>"):
+        if tree.nlocals is None:
+            Resolver().resolve(tree)
+
+        self.builder = CodeBuilder(name, nlocals=tree.nlocals)
+        for stmt in tree.body:
+            self.compile_statement(stmt)
+        self.builder.emit(LOAD_CONST, self.builder.add_const(None, key=('none',)))
+        self.builder.emit(RETURN)
+        return self.builder.build()
+
+    def compile_node(self, node):
+        method_name = f'compile_{node.__class__.__name__}'
+        method = getattr(self, method_name, self.no_compile_method)
+        return method(node)
+
+    def no_compile_method(self, node):
+        self.raise_error(f"{type(node).__name__} is not supported by the bytecode compiler")
+
+    def compile_statement(self, node):
+        self.compile_node(node)
+        if not isinstance(node, STATEMENT_NODES):
+            self.builder.emit(POP)
+
+    def compile_block(self, statements):
+        for stmt in statements or []:
+            self.compile_statement(stmt)
+
+    # VARIABLES
+    def emit_declare(self, identifier, slot):
+        if slot is None:
+            self.builder.emit(DECLARE_GLOBAL, self.builder.add_name(identifier))
+        else:
+            self.builder.emit(STORE_LOCAL, slot)
+
+    def emit_load(self, identifier, depth, slot):
+        if slot is None:
+            self.builder.emit(LOAD_GLOBAL, self.builder.add_name(identifier))
+        elif depth == 0:
+            self.builder.emit(LOAD_LOCAL, slot)
+        else:
+            self.builder.emit(LOAD_DEREF, (depth << DEREF_SHIFT) | slot)
+
+    def emit_store(self, identifier, depth, slot):
+        if slot is None:
+            self.builder.emit(STORE_GLOBAL, self.builder.add_name(identifier))
+        elif depth == 0:
+            self.builder.emit(STORE_LOCAL, slot)
+        else:
+            self.builder.emit(STORE_DEREF, (depth << DEREF_SHIFT) | slot)
+
+    def emit_call(self, op, argc, name_index=0):
+        if argc > MAX_ARGS:
+            self.raise_error(f"Too many arguments ({argc}), at most {MAX_ARGS} are supported")
+        self.builder.emit(op, (name_index << METHOD_SHIFT) | argc)
+
+    # STATEMENTS
+    def compile_VarDeclNode(self, node):
+        self.compile_node(node.value)
+        self.emit_declare(node.identifier, node.slot)
+
+    def compile_AssignNode(self, node):
+        identifier = getattr(node.identifier, 'identifier', node.identifier)
+        self.compile_node(node.value)
+        self.emit_store(identifier, node.depth, node.slot)
+
+    def compile_IfNode(self, node):
+        self.compile_node(node.condition)
+        jump_else = self.builder.emit(JUMP_IF_FALSE)
+        self.compile_block(node.body)
+        if node.else_body:
+            jump_end = self.builder.emit(JUMP)
+            self.builder.patch(jump_else, self.builder.position())
+            self.compile_block(node.else_body)
+            self.builder.patch(jump_end, self.builder.position())
+        else:
+            self.builder.patch(jump_else, self.builder.position())
+
+    def compile_BlockNode(self, node):
+        self.compile_block(node.body)
+
+    def compile_loop_body(self, body):
+        self.builder.loops.append(([], []))
+        self.compile_block(body)
+        return self.builder.loops.pop()
+
+    def patch_jumps(self, jumps, target):
+        for at in jumps:
+            self.builder.patch(at, target)
+
+    def compile_WhileNode(self, node):
+        start = self.builder.position()
+        self.compile_node(node.condition)
+        jump_end = self.builder.emit(JUMP_IF_FALSE)
+        breaks, continues = self.compile_loop_body(node.body)
+        self.builder.emit(JUMP, start)
+        self.patch_jumps(continues, start)
+        self.patch_jumps([jump_end] + breaks, self.builder.position())
+
+    def compile_ForNode(self, node):
+        self.compile_statement(node.init)
+        if node.counted:
+            # The start value and a description of the bound become one iterator
+            limit = node.condition.right
+            if isinstance(limit, VariableNode):
+                limit = (limit.identifier, limit.depth, limit.slot)
+            else:
+                limit = limit.value
+            self.emit_load(node.init.identifier, 0, node.init.slot)
+            self.builder.emit(COUNTED_ITER, self.builder.add_const((node.condition.op.type, node.counted, limit)))
+            self.compile_iteration(node.init.identifier, node.init.slot, node.body)
+            return
+
+        start = self.builder.position()
+        self.compile_node(node.condition)
+        jump_end = self.builder.emit(JUMP_IF_FALSE)
+        breaks, continues = self.compile_loop_body(node.body)
+        self.patch_jumps(continues, self.builder.position())
+        self.compile_statement(node.increment)
+        self.builder.emit(JUMP, start)
+        self.patch_jumps([jump_end] + breaks, self.builder.position())
+
+    def compile_ForInNode(self, node):
+        self.compile_node(node.iterable)
+        self.builder.emit(GET_ITER)
+        self.compile_iteration(node.identifier, node.slot, node.body)
+
+    def compile_iteration(self, identifier, slot, body):
+        # Runs body once per value of the iterator on top of the stack, which is popped when the loop ends
+        start = self.builder.position()
+        jump_end = self.builder.emit(FOR_ITER)
+        self.emit_declare(identifier, slot)
+        breaks, continues = self.compile_loop_body(body)
+        self.builder.emit(JUMP, start)
+        self.patch_jumps(continues, start)
+        self.patch_jumps(breaks, self.builder.position())
+        self.builder.emit(POP)
+        self.builder.patch(jump_end, self.builder.position())
+
+    def compile_FunctionDefNode(self, node):
+        parent = self.builder
+        self.builder = CodeBuilder(node.name, parent=parent, nlocals=node.nlocals, nparams=len(node.params))
+        self.compile_block(node.body)
+        self.builder.emit(LOAD_CONST, self.builder.add_const(None, key=('none',)))
+        self.builder.emit(RETURN)
+        code = self.builder.build()
+        self.builder = parent
+
+        self.builder.emit(MAKE_FUNCTION, self.builder.add_const(code))
+        self.emit_declare(node.name, node.slot)
+
+    def compile_ReturnNode(self, node):
+        if node.tail_call:
+            call = node.value
+            self.emit_load(call.name.value, call.depth, call.slot)
+            for arg in call.args:
+                self.compile_node(arg)
+            self.emit_call(TAIL_CALL, len(call.args))
+        else:
+            self.compile_node(node.value)
+        self.builder.emit(RETURN)
+
+    def compile_BreakNode(self, node):
+        if not self.builder.loops:
+            self.raise_error("'break' outside loop")
+        self.builder.loops[-1][0].append(self.builder.emit(JUMP))
+
+    def compile_ContinueNode(self, node):
+        if not self.builder.loops:
+            self.raise_error("'continue' outside loop")
+        self.builder.loops[-1][1].append(self.builder.emit(JUMP))
+
+    def compile_ImportNode(self, node):
+        self.builder.emit(IMPORT, self.builder.add_const(node))
+        self.emit_declare(node.name, node.slot)
+
+    # EXPRESSIONS
+    def compile_FunctionCallNode(self, node):
+        self.emit_load(node.name.value, node.depth, node.slot)
+        for arg in node.args:
+            self.compile_node(arg)
+        self.emit_call(CALL, len(node.args))
+
+    def compile_MethodCallNode(self, node):
+        self.compile_node(node.object_expr)
+        for arg in node.args:
+            self.compile_node(arg)
+        self.emit_call(CALL_METHOD, len(node.args), self.builder.add_name(node.method_name))
+
+    def compile_AttributeAccessNode(self, node):
+        self.compile_node(node.obj)
+        if isinstance(node.attr, FunctionCallNode):
+            self.builder.emit(GET_METHOD, self.builder.add_name(node.attr.name.value))
+            for arg in node.attr.args:
+                self.compile_node(arg)
+            self.emit_call(CALL, len(node.attr.args))
+        elif isinstance(node.attr, str):
+            self.builder.emit(GET_ATTR, self.builder.add_name(node.attr))
+        else:
+            self.raise_error(f"Invalid attribute type")
+
+    def compile_BinaryOpNode(self, node):
+        op = node.op
+        self.compile_node(node.left)
+        if op.type in (TokenType.AND, TokenType.OR):
+            jump_end = self.builder.emit(AND_JUMP if op.type == TokenType.AND else OR_JUMP)
+            self.compile_node(node.right)
+            self.builder.patch(jump_end, self.builder.position())
+            return
+
+        self.compile_node(node.right)
+        if op.type not in BINARY_OPERATOR_INDEX:
+            self.raise_error(f"Unsupported operator '{op.value}'")
+        self.builder.emit(BINARY_OP, BINARY_OPERATOR_INDEX[op.type])
+
+    def compile_UnaryOpNode(self, node):
+        self.compile_node(node.operand)
+        if node.op.value not in UNARY_OPERATOR_INDEX:
+            self.raise_error(f"Unsupported operator '{node.op.value}'")
+        self.builder.emit(UNARY_OP, UNARY_OPERATOR_INDEX[node.op.value])
+
+    def compile_NotNode(self, node):
+        self.compile_node(node.body)
+        self.builder.emit(NOT)
+
+    def compile_PostfixOpNode(self, node):
+        self.emit_load(node.identifier, node.depth, node.slot)
+        self.builder.emit(STEP, 1 if node.op.type == TokenType.PLUSPLUS else -1)
+        self.builder.emit(DUP)
+        self.emit_store(node.identifier, node.depth, node.slot)
+
+    def compile_VariableNode(self, node):
+        self.emit_load(node.identifier, node.depth, node.slot)
+
+    def compile_LiteralNode(self, node):
+        token = node.literal
+        self.builder.emit(LOAD_CONST, self.builder.add_const(node.value, key=(token.type, token.value)))
+
+    def compile_ConstantNode(self, node):
+        value = node.value
+        self.builder.emit(LOAD_CONST, self.builder.add_const(value, key=(value.__class__, repr(value))))
+
+    def compile_NothingLiteralNode(self, node):
+        self.builder.emit(LOAD_CONST, self.builder.add_const(NOTHING, key=('nothing',)))
+
+    def compile_ArrayNode(self, node):
+        for element in node.elements:
+            self.compile_node(element)
+        self.builder.emit(BUILD_ARRAY, len(node.elements))
+        if node.kind:
+            self.builder.emit(PACK_ARRAY, self.builder.add_name(node.kind))
+
+    def compile_MapNode(self, node):
+        for key, value in zip(node.keys, node.values):
+            self.compile_node(key)
+            self.compile_node(value)
+        self.builder.emit(BUILD_MAP, len(node.keys))
+
+    def compile_IndexAccessNode(self, node):
+        self.compile_node(node.array)
+        self.compile_node(node.index)
+        self.builder.emit(INDEX_GET)
+
+    def compile_SliceNode(self, node):
+        self.compile_node(node.array)
+        self.compile_node(node.start)
+        self.compile_node(node.end)
+        self.builder.emit(SLICE)
+
+    def compile_IndexAssignNode(self, node):
+        self.compile_node(node.array)
+        self.compile_node(node.index)
+        self.compile_node(node.value)
+        self.builder.emit(INDEX_SET)
+
+def disassemble(code, indent=""):
+    lines = [f"{indent}{code.name} (locals={code.nlocals}, params={code.nparams})"]
+    instructions = code.instructions
+    nested = []
+    for pc in range(0, len(instructions), 2):
+        op, arg = instructions[pc], instructions[pc + 1]
+        name = OPCODE_NAMES[op]
+        detail = ""
+        if op in (LOAD_CONST, MAKE_FUNCTION, IMPORT, COUNTED_ITER):
+            detail = f"({code.constants[arg]!r})"
+            if isinstance(code.constants[arg], CodeObject):
+                nested.append(code.constants[arg])
+        elif op in (LOAD_GLOBAL, STORE_GLOBAL, DECLARE_GLOBAL, GET_ATTR, GET_METHOD, PACK_ARRAY):
+            detail = f"({code.names[arg]})"
+        elif op in (LOAD_DEREF, STORE_DEREF):
+            detail = f"(depth={arg >> DEREF_SHIFT}, slot={arg & DEREF_MASK})"
+        elif op == CALL_METHOD:
+            detail = f"({code.names[arg >> METHOD_SHIFT]}, argc={arg & MAX_ARGS})"
+        lines.append(f"{indent}  {pc:>5} {name:<15} {arg:<6} {detail}".rstrip())
+    for child in nested:
+        lines.append(disassemble(child, indent + "  "))
+    return "\n".join(lines)
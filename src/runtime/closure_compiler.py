@@ -0,0 +1,448 @@
+from lexer import TokenType
+from runtime.values_ import *
+from tree import *
+from runtime.environment import Frame
+from runtime.interpreter import Interpreter
+from resolver import Resolver
+from runtime.operations import *
+
+class ClosureCompiler:
+    """
+    Compiles a tree into nested Python closures, once, before it is run.
+
+    Every closure takes the current Frame and returns the node's value.
+    Operators, literal values, variable slots and child closures are resolved
+    at compile time, so running a node costs one Python call instead of a
+    visit() dispatch. Nodes without a compile_ method are handed back to the
+    interpreter.
+    """
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+
+    def compile(self, node):
+        method_name = f'compile_{node.__class__.__name__}'
+        method = getattr(self, method_name, self.compile_fallback)
+        return method(node)
+
+    def compile_fallback(self, node):
+        interpreter = self.interpreter
+
+        def fallback(frame):
+            old_env, old_frame = interpreter.env, interpreter.frame
+            interpreter.env, interpreter.frame = frame.global_env, frame
+            try:
+                return interpreter.visit(node)
+            finally:
+                interpreter.env, interpreter.frame = old_env, old_frame
+        return fallback
+
+    # VARIABLES
+    def compile_load(self, identifier, depth, slot):
+        if slot is None:
+            def load_global(frame):
+                return frame.global_env.get(identifier)
+            return load_global
+        elif depth == 0:
+            def load_local(frame):
+                return frame.slots[slot]
+            return load_local
+
+        def load_outer(frame):
+            return frame.get(depth, slot)
+        return load_outer
+
+    def compile_store(self, identifier, depth, slot, value):
+        if slot is None:
+            def store_global(frame):
+                frame.global_env.assign(identifier, value(frame))
+            return store_global
+        elif depth == 0:
+            def store_local(frame):
+                frame.slots[slot] = value(frame)
+            return store_local
+
+        def store_outer(frame):
+            frame.set(depth, slot, value(frame))
+        return store_outer
+
+    def compile_declare(self, identifier, slot, value):
+        if slot is None:
+            def declare_global(frame):
+                frame.global_env.declare(identifier, value(frame))
+            return declare_global
+
+        def declare_local(frame):
+            frame.slots[slot] = value(frame)
+        return declare_local
+
+    def compile_block(self, statements):
+        codes = tuple(self.compile(stmt) for stmt in statements or [])
+        if len(codes) == 1:
+            return codes[0]
+
+        def block(frame):
+            for code in codes:
+                result = code(frame)
+                if result.__class__ is Completion:
+                    return result
+        return block
+
+    def compile_ProgramNode(self, node):
+        codes = tuple(self.compile(stmt) for stmt in node.body)
+
+        def program(frame):
+            result = None
+            for code in codes:
+                result = code(frame)
+                if result.__class__ is Completion:
+                    return result.value
+            return result
+        return program
+
+    # STATEMENTS
+    def compile_VarDeclNode(self, node):
+        return self.compile_declare(node.identifier, node.slot, self.compile(node.value))
+
+    def compile_AssignNode(self, node):
+        identifier = getattr(node.identifier, 'identifier', node.identifier)
+        return self.compile_store(identifier, node.depth, node.slot, self.compile(node.value))
+
+    def compile_IfNode(self, node):
+        condition = self.compile(node.condition)
+        body = self.compile_block(node.body)
+        else_body = self.compile_block(node.else_body) if node.else_body else None
+
+        def if_(frame):
+            if condition(frame):
+                return body(frame)
+            elif else_body:
+                return else_body(frame)
+        return if_
+
+    def compile_BlockNode(self, node):
+        return self.compile_block(node.body)
+
+    def compile_WhileNode(self, node):
+        condition = self.compile(node.condition)
+        body = self.compile_block(node.body)
+
+        def while_(frame):
+            while condition(frame):
+                result = body(frame)
+                if result.__class__ is Completion:
+                    if result is BREAK:
+                        break
+                    elif result is not CONTINUE:
+                        return result
+        return while_
+
+    def compile_ForNode(self, node):
+        init = self.compile(node.init)
+        if node.counted:
+            return self.compile_counted_loop(node, init)
+        condition = self.compile(node.condition)
+        increment = self.compile(node.increment)
+        body = self.compile_block(node.body)
+
+        def for_(frame):
+            init(frame)
+            while condition(frame):
+                result = body(frame)
+                if result.__class__ is Completion:
+                    if result is BREAK:
+                        break
+                    elif result is not CONTINUE:
+                        return result
+                increment(frame)
+        return for_
+
+    def compile_counted_loop(self, node, init):
+        slot = node.init.slot
+        comparison = node.condition.op.type
+        counted = node.counted
+        limit = node.condition.right
+        run = self.compile_loop(slot, node.body)
+
+        if isinstance(limit, VariableNode):
+            load = self.compile_load(limit.identifier, limit.depth, limit.slot)
+
+            def counted_loop(frame):
+                init(frame)
+                return run(frame, counted_values(frame.slots[slot], lambda: load(frame), comparison, counted))
+            return counted_loop
+
+        bound = limit.value
+
+        def counted_constant_loop(frame):
+            init(frame)
+            return run(frame, counted_values(frame.slots[slot], bound, comparison, counted))
+        return counted_constant_loop
+
+    def compile_ForInNode(self, node):
+        iterable = self.compile(node.iterable)
+        run = self.compile_loop(node.slot, node.body)
+
+        def for_in(frame):
+            return run(frame, iterate(iterable(frame)))
+        return for_in
+
+    def compile_loop(self, slot, body):
+        body = self.compile_block(body)
+
+        def run(frame, values):
+            slots = frame.slots
+            for value in values:
+                slots[slot] = value
+                result = body(frame)
+                if result.__class__ is Completion:
+                    if result is BREAK:
+                        break
+                    elif result is not CONTINUE:
+                        return result
+        return run
+
+    def compile_FunctionDefNode(self, node):
+        name = node.name
+        params = node.params
+        body = node.body
+        nlocals = node.nlocals
+        nparams = len(params)
+        reuse_frames = node.reuse_frames
+        code = self.compile_block(body)
+
+        def make_function(frame):
+            return CompiledFunctionValue(name, params, body, frame.global_env, frame, nlocals, nparams, reuse_frames, code=code)
+        return self.compile_declare(name, node.slot, make_function)
+
+    def compile_ReturnNode(self, node):
+        if node.tail_call:
+            call = node.value
+            load = self.compile_load(call.name.value, call.depth, call.slot)
+            args = tuple(self.compile(arg) for arg in call.args)
+
+            def tail_call(frame):
+                return Completion("tail", (load(frame), [arg(frame) for arg in args]))
+            return tail_call
+
+        value = self.compile(node.value)
+
+        def return_(frame):
+            return Completion("return", value(frame))
+        return return_
+
+    def compile_BreakNode(self, node):
+        def break_(frame):
+            return BREAK
+        return break_
+
+    def compile_ContinueNode(self, node):
+        def continue_(frame):
+            return CONTINUE
+        return continue_
+
+    # EXPRESSIONS
+    def compile_FunctionCallNode(self, node):
+        interpreter = self.interpreter
+        load = self.compile_load(node.name.value, node.depth, node.slot)
+        args = tuple(self.compile(arg) for arg in node.args)
+
+        def function_call(frame):
+            func = load(frame)
+            return func.call(interpreter, [arg(frame) for arg in args])
+        return function_call
+
+    def compile_MethodCallNode(self, node):
+        obj = self.compile(node.object_expr)
+        method = node.method_name
+        args = tuple(self.compile(arg) for arg in node.args)
+
+        def method_call(frame):
+            return call_method(obj(frame), method, [arg(frame) for arg in args])
+        return method_call
+
+    def compile_AttributeAccessNode(self, node):
+        interpreter = self.interpreter
+        obj = self.compile(node.obj)
+        attr = node.attr
+
+        if isinstance(attr, FunctionCallNode):
+            name = attr.name.value
+            args = tuple(self.compile(arg) for arg in attr.args)
+
+            def attribute_call(frame):
+                module = obj(frame)
+                arg_values = [arg(frame) for arg in args]
+                if not isinstance(module, ModuleValue):
+                    return call_method(module, name, arg_values)
+                func = module.get(name)
+                if isinstance(func, (FunctionValue, BuiltInFunctionValue)):
+                    return func.call(interpreter, arg_values)
+                raise Exception(f"Invalid function call on '{name}()'")
+            return attribute_call
+
+        def attribute_access(frame):
+            module = obj(frame)
+            if not isinstance(module, ModuleValue):
+                raise Exception(f"{module} has no attributes")
+            if isinstance(attr, str):
+                return module.get(attr)
+            raise Exception(f"Invalid attribute type")
+        return attribute_access
+
+    def compile_BinaryOpNode(self, node):
+        op = node.op
+        left = self.compile(node.left)
+        right = self.compile(node.right)
+
+        if op.type == TokenType.AND:
+            def and_(frame):
+                if not left(frame):
+                    return False
+                return right(frame)
+            return and_
+        elif op.type == TokenType.OR:
+            def or_(frame):
+                if left(frame):
+                    return True
+                return right(frame)
+            return or_
+
+        operator = BINARY_OPS.get(op.type)
+        if operator is None:
+            def no_op(frame):
+                left(frame)
+                right(frame)
+            return no_op
+
+        def binary_op(frame):
+            return operator(left(frame), right(frame))
+        return binary_op
+
+    def compile_UnaryOpNode(self, node):
+        operand = self.compile(node.operand)
+        operator = UNARY_OPS.get(node.op.value)
+
+        def unary_op(frame):
+            value = operand(frame)
+            if operator:
+                return operator(value)
+        return unary_op
+
+    def compile_NotNode(self, node):
+        body = self.compile(node.body)
+
+        def not_(frame):
+            return not body(frame)
+        return not_
+
+    def compile_PostfixOpNode(self, node):
+        load = self.compile_load(node.identifier, node.depth, node.slot)
+        step = 1 if node.op.type == TokenType.PLUSPLUS else -1
+
+
+        def stepped(frame):
+            return step_value(load(frame), step)
+        store = self.compile_store(node.identifier, node.depth, node.slot, stepped)
+
+        def postfix_op(frame):
+            store(frame)
+            return load(frame)
+        return postfix_op
+
+    def compile_VariableNode(self, node):
+        return self.compile_load(node.identifier, node.depth, node.slot)
+
+    def compile_ImportNode(self, node):
+        interpreter = self.interpreter
+
+        def load_module(frame):
+            old_env = interpreter.env
+            interpreter.env = frame.global_env
+            try:
+                return interpreter.load_module(node)
+            finally:
+                interpreter.env = old_env
+        return self.compile_declare(node.name, node.slot, load_module)
+
+    def compile_LiteralNode(self, node):
+        value = node.value
+
+        def literal(frame):
+            return value
+        return literal
+
+    def compile_ConstantNode(self, node):
+        value = node.value
+
+        def constant(frame):
+            return value
+        return constant
+
+    def compile_NothingLiteralNode(self, node):
+        def nothing(frame):
+            return NOTHING
+        return nothing
+
+    def compile_ArrayNode(self, node):
+        elements = tuple(self.compile(element) for element in node.elements)
+        kind = node.kind
+
+        if kind:
+            def typed_array(frame):
+                return pack_array([element(frame) for element in elements], kind)
+            return typed_array
+
+        def array(frame):
+            return [element(frame) for element in elements]
+        return array
+
+    def compile_MapNode(self, node):
+        entries = []
+        for key, value in zip(node.keys, node.values):
+            entries.append(self.compile(key))
+            entries.append(self.compile(value))
+        entries = tuple(entries)
+
+        def map_(frame):
+            return build_map([entry(frame) for entry in entries])
+        return map_
+
+    def compile_IndexAccessNode(self, node):
+        array = self.compile(node.array)
+        index = self.compile(node.index)
+
+        def index_access(frame):
+            return index_get(array(frame), index(frame))
+        return index_access
+
+    def compile_SliceNode(self, node):
+        array = self.compile(node.array)
+        start = self.compile(node.start)
+        end = self.compile(node.end)
+
+        def slice_(frame):
+            arr = array(frame)
+            return slice_array(arr, start(frame), end(frame))
+        return slice_
+
+    def compile_IndexAssignNode(self, node):
+        array = self.compile(node.array)
+        index = self.compile(node.index)
+        value = self.compile(node.value)
+
+        def index_assign(frame):
+            arr = array(frame)
+            return index_set(arr, index(frame), value(frame))
+        return index_assign
+
+class ClosureInterpreter(Interpreter):
+    def add_hook(self, hook, events=()):
+        # Compiled code never goes back through visit, so there is nothing to hook into
+        self.raise_error("tracing hooks are only supported by the tree engine")
+
+    def interpret(self, tree):
+        if isinstance(tree, ProgramNode):
+            if tree.nlocals is None:
+                Resolver().resolve(tree)
+            program = ClosureCompiler(self).compile(tree)
+            return program(Frame(tree.nlocals, global_env=self.env))
@@ -12,9 +12,9 @@ class Environment:
 
     def declare(self, identifier, value):
         current_scope = self.scopes[-1]
-        if str(identifier) in current_scope:
+        if identifier in current_scope:
             raise Exception(f"'{identifier}' already exists")
-        current_scope[str(identifier)] = value
+        current_scope[identifier] = value
 
     def assign(self, identifier, value):
         for scope in reversed(self.scopes):
@@ -40,6 +40,38 @@ class Environment:
     
     def debug(self):
         print("SCOPE: ", self.scopes)
+        if self.parent:
+            print("Parent →")
+            self.parent.debug()
+
+class Frame:
+    """
+    Array-backed storage for the local variables of one function call (or of
+    a program's nested blocks), indexed by the slots assigned by the Resolver.
+    parent is the frame the function was defined in; global_env is the
+    Environment holding the program's globals, builtins and modules.
+    """
+    __slots__ = ('slots', 'parent', 'global_env')
+
+    def __init__(self, size, parent=None, global_env=None):
+        self.slots = [None] * size
+        self.parent = parent
+        self.global_env = global_env
+
+    def get(self, depth, slot):
+        frame = self
+        for _ in range(depth):
+            frame = frame.parent
+        return frame.slots[slot]
+
+    def set(self, depth, slot, value):
+        frame = self
+        for _ in range(depth):
+            frame = frame.parent
+        frame.slots[slot] = value
+
+    def debug(self):
+        print("FRAME: ", self.slots)
         if self.parent:
             print("Parent →")
             self.parent.debug()
\ No newline at end of file
@@ -1,35 +1,169 @@
 from lexer import TokenType
 from runtime.values_ import *
 from tree import *
-from runtime.environment import Environment
+from runtime.environment import Environment, Frame
+from runtime.operations import *
+from runtime.tracing import TraceEvent, HOOK_EVENTS
 import os
+import time
 
-from lexer import Lexer
-from parser import Parser
+from resolver import Resolver
+from loader import load_tree
+from optimizer import Optimizer
 
-import runtime.modules.math as math_module
+from runtime.module_registry import ModuleRegistry
 # from utils.errors import *
 
 class Interpreter:
     def __init__(self):
         self.env = Environment()
+        self.frame = None
         self.load_stdlib()
-        self.modules = {}
-
-        self.std_lib_modules = ["math"]
+        self.modules = ModuleRegistry()
+        self.use_cache = True
+        self.optimize = False
+        self.hooks = []
+        self.trace_depth = 0
+        self.traced_error = None
+        self.trace_statements = False
+        self.return_value = None
+        self.tail_function = None
+        self.tail_args = None
 
     def raise_error(self, message):
         raise Exception(message)
 
     def interpret(self, tree):
         if isinstance(tree, ProgramNode):
-            self.visit(tree)
+            if tree.nlocals is None:
+                Resolver().resolve(tree)
+
+            old_frame = self.frame
+            self.frame = Frame(tree.nlocals, global_env=self.env)
+            try:
+                return self.visit(tree)
+            finally:
+                self.frame = old_frame
+
+    # TRACING
+    def add_hook(self, hook, events=HOOK_EVENTS):
+        """
+        Calls hook(event) with a TraceEvent for every event of the given
+        kinds ("call", "return", "statement", "exception").
+
+        Hooks are only looked at while at least one is registered: adding
+        the first one swaps in traced versions of execute and the call
+        visitors on this instance, and removing the last one drops them.
+        """
+        events = frozenset(events)
+        unknown = events.difference(HOOK_EVENTS)
+        if unknown:
+            self.raise_error(f"unknown trace event '{sorted(unknown)[0]}'")
+        self.hooks.append((hook, events))
+        self.install_tracing()
+        return hook
+
+    def remove_hook(self, hook):
+        self.hooks = [(other, events) for other, events in self.hooks if other is not hook]
+        self.install_tracing()
+
+    def install_tracing(self):
+        for name in ('execute', 'visit_FunctionCallNode', 'visit_AttributeAccessNode'):
+            self.__dict__.pop(name, None)
+
+        wanted = set()
+        for _, events in self.hooks:
+            wanted |= events
+        self.trace_statements = "statement" in wanted
+        if wanted & {"statement", "exception"}:
+            self.execute = self.traced_execute
+        if wanted & {"call", "return"}:
+            self.visit_FunctionCallNode = self.traced_visit_FunctionCallNode
+            self.visit_AttributeAccessNode = self.traced_visit_AttributeAccessNode
+
+    def emit(self, event):
+        for hook, events in self.hooks:
+            if event.event in events:
+                hook(event)
+
+    def traced_execute(self, node):
+        if self.trace_statements:
+            self.emit(TraceEvent("statement", node, depth=self.trace_depth))
+        try:
+            return self.visit(node)
+        except Exception as error:
+            # Only reported by the statement it was raised in, not by every enclosing one
+            if error is not self.traced_error:
+                self.traced_error = error
+                self.emit(TraceEvent("exception", node, error=error, depth=self.trace_depth))
+            raise
+
+    def traced_call(self, node, name, func, args):
+        depth = self.trace_depth
+        self.emit(TraceEvent("call", node, name, args, depth=depth))
+        self.trace_depth = depth + 1
+        value = error = None
+        start = time.perf_counter()
+        try:
+            value = func.call(self, args)
+            return value
+        except BaseException as raised:
+            error = raised
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.trace_depth = depth
+            self.emit(TraceEvent("return", node, name, args, value, elapsed, error, depth))
+
+    def traced_visit_FunctionCallNode(self, node):
+        func = self.lookup(node.name.value, node.depth, node.slot)
+        arg_values = [self.visit(arg) for arg in node.args]
+        return self.traced_call(node, node.name.value, func, arg_values)
+
+    def traced_visit_AttributeAccessNode(self, node):
+        if not isinstance(node.attr, FunctionCallNode):
+            return Interpreter.visit_AttributeAccessNode(self, node)
+
+        obj = self.visit(node.obj)
+        name = node.attr.name.value
+        if not isinstance(obj, ModuleValue):
+            return call_method(obj, name, [self.visit(arg) for arg in node.attr.args])
+        func = obj.get(name)
+        arg_values = [self.visit(arg) for arg in node.attr.args]
+        if isinstance(func, (FunctionValue, BuiltInFunctionValue)):
+            return self.traced_call(node, f"{obj.name}.{name}", func, arg_values)
+        raise Exception(f"Invalid function call on '{name}()'")
+
+    # VARIABLES
+    def lookup(self, identifier, depth, slot):
+        if slot is None:
+            return self.env.get(identifier)
+        if depth == 0:
+            return self.frame.slots[slot]
+        return self.frame.get(depth, slot)
+
+    def store(self, identifier, depth, slot, value):
+        if slot is None:
+            self.env.assign(identifier, value)
+        elif depth == 0:
+            self.frame.slots[slot] = value
+        else:
+            self.frame.set(depth, slot, value)
+
+    def declare(self, identifier, slot, value):
+        if slot is None:
+            self.env.declare(identifier, value)
+        else:
+            self.frame.slots[slot] = value
 
     def visit(self, node):
         method_name = f'visit_{node.__class__.__name__}'
         method = getattr(self, method_name, self.no_visit_method)
         return method(node)
 
+    # Statements go through execute so tracing can tell them apart from expressions
+    execute = visit
+
     def no_visit_method(self, node):
         raise Exception(f"No visit_{type(node).__name__} method defined")
     
@@ -37,7 +171,10 @@ class Interpreter:
         result = None
 
         for statement in node.body:
-            result = self.visit(statement)
+            result = self.execute(statement)
+            # A return at the top level ends the program (or module)
+            if result is RETURN:
+                return self.return_value
 
         return result
     
@@ -55,258 +192,256 @@ class Interpreter:
                 raise Exception(f"Invalid function call on '{node.attr.name.value}()'")
             else:
                 raise Exception(f"Invalid attribute type")
+        elif isinstance(node.attr, FunctionCallNode):
+            # `x.method(...)` used as a value, on anything that is not a module
+            return call_method(obj, node.attr.name.value, [self.visit(arg) for arg in node.attr.args])
 
         raise Exception(f"{obj} has no attributes")
     
     def visit_ImportNode(self, node):
-        run_py = False
-
-        module_name = node.name
-
-        if module_name not in self.std_lib_modules:
-            filename = node.path + ".or"
-
-            if not os.path.exists(filename):
-                self.raise_error(f"Unable to import '{filename}'")
-
-            source = open(filename).read()
-        else:
-            if module_name in self.std_lib_modules:
-                filename = rf"src\runtime\modules\{module_name}.py"
-                run_py = True
-            else:
-                filename = rf"src\runtime\modules\{module_name}.or"
-            
-            if not os.path.exists(filename):
-                self.raise_error(f"Unable to import '{filename}'")
+        self.declare(node.name, node.slot, self.load_module(node))
 
-            source = open(filename).read()
+    def load_module(self, node):
+        return self.modules.load(self, node.name, node.path)
 
-        if run_py == True:
-            return self.env.declare("math", ModuleValue(module_name, math_module.build_math_module()))
-            
-        tokens = list(Lexer(source).generate_tokens())
-        tree = Parser(tokens).parse()
+    def create_module(self, name):
+        return ModuleValue(name, Environment(parent=None))
 
-        module_env = Environment(parent=None)
+    def execute_module(self, module, filename):
+        with open(filename) as file:
+            source = file.read()
+        tree = load_tree(source, filename, cache=self.use_cache)
+        if self.optimize:
+            Optimizer().optimize(tree)
 
         old_env = self.env
-        self.env = module_env
-        self.load_stdlib()
-        
-        self.visit(tree)
-        self.env = old_env
-
-        module = ModuleValue(module_name, module_env)
-        self.modules[module_name] = module
-        self.env.declare(module_name, module)
+        self.env = module.env
+        try:
+            self.load_stdlib()
+            self.interpret(tree)
+        finally:
+            self.env = old_env
 
     def visit_IndexAccessNode(self, node):
         arr = self.visit(node.array)
-        index = self.visit(node.index).value
-        if not isinstance(arr, list):
-            self.raise_error("Cannot index non-list")
-        if not isinstance(index, int):
-            self.raise_error("Cannot index with non-integer")
-        if abs(index) > len(arr):
-            self.raise_error("Index is out of range")
-
-        return arr[index]
+        return index_get(arr, self.visit(node.index))
     
+    def visit_SliceNode(self, node):
+        arr = self.visit(node.array)
+        return slice_array(arr, self.visit(node.start), self.visit(node.end))
+
     def visit_IndexAssignNode(self, node):
         arr = self.visit(node.array)
-        index = self.visit(node.index).value
+        index = self.visit(node.index)
         value = self.visit(node.value)
-
-        if not isinstance(arr, list):
-            self.raise_error("Cannot index non-list")
-        if not isinstance(index, int):
-            self.raise_error("Cannot index with non-integer")
-        if abs(index) > len(arr):
-            self.raise_error("Index is out of range")
-
-        arr[index] = value
-        return value
+        return index_set(arr, index, value)
     
     def visit_MethodCallNode(self, node):
-        def handle_array_method(arr, method, args):
-            match(method):
-                case 'push':
-                    if len(args) < 1:
-                        self.raise_error("push() method takes at least 1 argument")
-                    
-                    for i in args:
-                        arr.append(i)
-                
-                case 'pop':
-                    if len(args) > 0:
-                        self.raise_error("pop() method takes no arguments")
-                    arr.pop()
-
-                case 'insert':
-                    if len(args) != 2:
-                        self.raise_error("insert() method takes exactly 2 arguments: (index, value)")
-
-                    idx, value = args
-                    
-                    if not isinstance(idx.value, int):
-                        self.raise_error("insert(): index argument must be an integer")
-                    if idx.value < 0 or idx.value >= len(arr):
-                        self.raise_error("insert(): index argument is out of bounds")
-
-                    arr.insert(idx.value, value)
-
-                case 'delete':
-                    if len(args) != 1:
-                        self.raise_error("delete() method takes exactly 1 argument")
-                    
-                    idx = args[0]
-                    
-                    if not isinstance(idx.value, int):
-                        self.raise_error("delete(): index argument must be an integer")
-                    if idx.value < 0 or idx.value >= len(arr):
-                        self.raise_error("delete(): index argument is out of bounds")
-
-                    arr.pop(idx.value)
-
-                case _:
-                    self.raise_error(f"Unknown array method '{method}'")
-
         obj = self.visit(node.object_expr)
-
-        method = node.method_name
         args = [self.visit(arg) for arg in node.args]
-
-        if isinstance(obj, list):
-            return handle_array_method(obj, method, args)
-        
-        raise Exception(f"'{method}' cannot be called on this type")
+        return call_method(obj, node.method_name, args)
 
     def visit_ArrayNode(self, node):
+        if node.kind:
+            return pack_array([self.visit(element) for element in node.elements], node.kind)
         return [self.visit(element) for element in node.elements]
+
+    def visit_MapNode(self, node):
+        entries = []
+        for key, value in zip(node.keys, node.values):
+            entries.append(self.visit(key))
+            entries.append(self.visit(value))
+        return build_map(entries)
     
     def visit_ReturnNode(self, node):
-        raise ReturnSignal(self.visit(node.value))
+        if node.tail_call:
+            # Left for call_function, which reruns the body instead of recursing
+            call = node.value
+            callee = self.lookup(call.name.value, call.depth, call.slot)
+            self.tail_args = [self.visit(arg) for arg in call.args]
+            self.tail_function = callee
+            return RETURN
+        self.return_value = self.visit(node.value)
+        return RETURN
+
+    def visit_BreakNode(self, node):
+        return BREAK
+
+    def visit_ContinueNode(self, node):
+        return CONTINUE
     
     def visit_ParameterNode(self, node):
         return node.params.identifier
 
     def visit_FunctionDefNode(self, node):
-        function = FunctionValue(node.name, node.params, node.body, self.env)
-        self.env.declare(node.name, function)
+        function = FunctionValue(node.name, node.params, node.body, self.env, self.frame, node.nlocals, len(node.params), node.reuse_frames, line=node.line)
+        self.declare(node.name, node.slot, function)
 
     def visit_FunctionCallNode(self, node):
-        func = self.env.get(node.name.value)
+        func = self.lookup(node.name.value, node.depth, node.slot)
 
-        # Evaluate arguments in the CURRENT environment (before switching)
+        # Evaluate arguments in the CURRENT frame (before switching)
         arg_values = [self.visit(arg) for arg in node.args]
 
-        if isinstance(func, BuiltInFunctionValue):
+        if func.__class__ is not FunctionValue:
             return func.call(self, arg_values)
-        
-        call_env = Environment(func.env)
-        call_env.enter_scope()
 
+        # call_function inlined: every Python frame here is one less Orion call before a RecursionError
+        call_frame = func.new_frame(arg_values)
         old_env = self.env
-        self.env = call_env
-        
-        # Declare parameters with pre-evaluated argument values
-        for param, arg_value in zip(func.params, arg_values):
-            param_name = self.visit(param)
-            call_env.declare(param_name, arg_value)
-        
+        old_frame = self.frame
+        self.env = func.env
+        self.frame = call_frame
         try:
             for stmt in func.body:
-                self.visit(stmt)
-        except ReturnSignal as r:
-            result = r.value
-            call_env.exit_scope()
+                if self.execute(stmt) is RETURN:
+                    if self.tail_function is None:
+                        return self.return_value
+                    return self.run_tail_calls(func, call_frame)
+        finally:
             self.env = old_env
-            return result
+            self.frame = old_frame
+            func.release_frame(call_frame)
+
+    def call_function(self, func, arg_values):
+        # Parameters occupy the first slots of the call frame
+        call_frame = func.new_frame(arg_values)
+
+        old_env = self.env
+        old_frame = self.frame
+        self.env = func.env
+        self.frame = call_frame
 
-        call_env.exit_scope()
-        self.env = old_env
+        try:
+            for stmt in func.body:
+                if self.execute(stmt) is RETURN:
+                    if self.tail_function is None:
+                        return self.return_value
+                    return self.run_tail_calls(func, call_frame)
+        finally:
+            self.env = old_env
+            self.frame = old_frame
+            func.release_frame(call_frame)
     
+    def run_tail_calls(self, func, call_frame):
+        # Self tail calls rerun the body in the same Python frame
+        while True:
+            callee, args = self.tail_function, self.tail_args
+            self.tail_function = self.tail_args = None
+            if callee is not func:
+                return callee.call(self, args)
+
+            call_frame = func.rebind_frame(call_frame, args)
+            self.frame = call_frame
+            for stmt in func.body:
+                if self.execute(stmt) is RETURN:
+                    break
+            else:
+                return None
+            if self.tail_function is None:
+                return self.return_value
+
+    # Loops only look at a statement's result when the body stopped early
     def visit_WhileNode(self, node):
-        self.env.enter_scope()
         while self.visit(node.condition):
             for stmt in node.body:
-                self.visit(stmt)
-        self.env.exit_scope()
+                result = self.execute(stmt)
+                if result.__class__ is Completion:
+                    break
+            else:
+                continue
+
+            if result is BREAK:
+                break
+            elif result is not CONTINUE:
+                return result
     
     def visit_ForNode(self, node):
-        self.env.enter_scope()
         self.visit(node.init)
+        if node.counted:
+            slot = node.init.slot
+            limit = node.condition.right
+            if limit.__class__ is VariableNode:
+                bound = lambda: self.lookup(limit.identifier, limit.depth, limit.slot)
+            else:
+                bound = limit.value
+            values = counted_values(self.frame.slots[slot], bound, node.condition.op.type, node.counted)
+            return self.run_loop(slot, values, node.body)
+
         while self.visit(node.condition):
             for stmt in node.body:
-                self.visit(stmt)
-            
+                result = self.execute(stmt)
+                if result.__class__ is Completion:
+                    break
+            else:
+                self.visit(node.increment)
+                continue
+
+            if result is BREAK:
+                break
+            elif result is not CONTINUE:
+                return result
             self.visit(node.increment)
-        self.env.exit_scope()
+
+    def visit_ForInNode(self, node):
+        return self.run_loop(node.slot, iterate(self.visit(node.iterable)), node.body)
+
+    def run_loop(self, slot, values, body):
+        # The loop variable is stored straight into its slot, no condition or increment to evaluate
+        slots = self.frame.slots
+        for value in values:
+            slots[slot] = value
+            for stmt in body:
+                result = self.execute(stmt)
+                if result.__class__ is Completion:
+                    break
+            else:
+                continue
+
+            if result is BREAK:
+                break
+            elif result is not CONTINUE:
+                return result
+
+    def visit_BlockNode(self, node):
+        for stmt in node.body:
+            result = self.execute(stmt)
+            if result.__class__ is Completion:
+                return result
 
     def visit_IfNode(self, node):
         condition = self.visit(node.condition)
         if condition:
-            self.env.enter_scope()
-            for stmt in node.body:
-                self.visit(stmt)
-            self.env.exit_scope()
+            body = node.body
         elif node.else_body:
-            self.env.enter_scope()
-            for stmt in node.else_body:
-                self.visit(stmt)
-            self.env.exit_scope()
+            body = node.else_body
+        else:
+            return
+        for stmt in body:
+            result = self.execute(stmt)
+            if result.__class__ is Completion:
+                return result
     
     def visit_AssignNode(self, node):
         value = self.visit(node.value)
         identifier = getattr(node.identifier, 'identifier', node.identifier)
-        self.env.assign(identifier, value)
+        self.store(identifier, node.depth, node.slot, value)
 
     def visit_VarDeclNode(self, node):
         value = self.visit(node.value)
-        self.env.declare(node.identifier, value)
+        self.declare(node.identifier, node.slot, value)
 
     def visit_UnaryOpNode(self, node):
         operand = self.visit(node.operand)
-        op = node.op
-        if op.value == '+':
-            if isinstance(operand, IntValue):
-                return IntValue(operand.value)
-            elif isinstance(operand, FloatValue):
-                return FloatValue(operand.value)
-        elif op.value == '-':
-            if isinstance(operand, IntValue):
-                return IntValue(operand.value * -1)
-            elif isinstance(operand, FloatValue):
-                return FloatValue(operand.value * -1)
+        op = UNARY_OPS.get(node.op.value)
+        if op:
+            return op(operand)
 
     def visit_BinaryOpNode(self, node):
-        def eval_values(left, op, right):
-            left = getattr(left, 'value', left)
-            right = getattr(right, 'value', right)
-            # Nothing value
-            if op in ('+', '-', '*', '/') and None in (left, right):
-                raise TypeError(f"Cannot perform operations with 'Nothing' type")
-            if op == '+':
-                if isinstance(left, str) or isinstance(right, str):
-                    return (str(left)+str(right))
-                return (left+right)
-            elif op == '-': return (left-right)
-            elif op == '*': return (left*right)
-            elif op == '/':
-                if right != 0: return (left/right) 
-                else: raise ZeroDivisionError("Cannot divide by zero")
-            elif op == '==': return bool(left==right)
-            elif op == '>': return bool(left>right)
-            elif op == '<': return bool(left<right)
-            elif op == '<=': return bool(left<=right)
-            elif op == '>=': return bool(left>=right)
-            elif op == '!=': return bool(left!=right)
-
         op = node.op
         left = self.visit(node.left)
         if op.type == TokenType.AND:
-            if left == False:
+            if not left:
                 return False
             else:
                 return self.visit(node.right)
@@ -316,65 +451,38 @@ class Interpreter:
             else:
                 return self.visit(node.right)
         right = self.visit(node.right)
-        if op.type == TokenType.PLUS:
-            return eval_values(left, '+', right)
-        elif op.type == TokenType.MINUS:
-            return eval_values(left, '-', right)
-        elif op.type == TokenType.MUL:
-            return eval_values(left, '*', right)
-        elif op.type == TokenType.DIV:
-            return eval_values(left, '/', right)
-        # BOOLEAN OPS
-        elif op.type == TokenType.EQEQ:
-            return eval_values(left, '==', right)
-        elif op.type == TokenType.GT:
-            return eval_values(left, '>', right)
-        elif op.type == TokenType.LT:
-            return eval_values(left, '<', right)
-        elif op.type == TokenType.LTEQ:
-            return eval_values(left, '<=', right)
-        elif op.type == TokenType.GTEQ:
-            return eval_values(left, '>=', right)
-        elif op.type == TokenType.NOTEQ:
-            return eval_values(left, '!=', right)
+        operator = BINARY_OPS.get(op.type)
+        if operator:
+            return operator(left, right)
         
     def visit_NotNode(self, node):
         bool = self.visit(node.body)
         return not bool
         
     def visit_VariableNode(self, node):
-        identifier = node.identifier
-        value = self.env.get(identifier)
-        return value
+        return self.lookup(node.identifier, node.depth, node.slot)
     
     def visit_PostfixOpNode(self, node):
         identifier = node.identifier
-        value = self.env.get(identifier)
+        value = self.lookup(identifier, node.depth, node.slot)
         if node.op.type == TokenType.PLUSPLUS:
-            old_value = value
-            value.value += 1
-            self.env.assign(identifier, value)
+            value = step_value(value, 1)
+            self.store(identifier, node.depth, node.slot, value)
         if node.op.type == TokenType.MINUSMINUS:
-            old_value = value
-            value.value -= 1
-            self.env.assign(identifier, value)
-        return old_value
+            value = step_value(value, -1)
+            self.store(identifier, node.depth, node.slot, value)
+        return value
         
     def visit_NothingLiteralNode(self, node):
         token = node.literal
         if token == None:
-            return NothingValue(token)
+            return NOTHING
     
     def visit_LiteralNode(self, node):
-        token = node.literal
-        if token.type == TokenType.INT:
-            return IntValue(token.value)
-        elif token.type == TokenType.FLOAT:
-            return FloatValue(token.value)
-        elif token.type == TokenType.STRING:
-            return StringValue(token.value)
-        elif token.type == TokenType.BOOL:
-            return BoolValue(token.value)
+        return node.value
+
+    def visit_ConstantNode(self, node):
+        return node.value
         
     def load_stdlib(self):
         def builtin_print(interpreter, args):
@@ -383,14 +491,14 @@ class Interpreter:
                 if isinstance(val, (FunctionValue, BuiltInFunctionValue)):
                     self.raise_error(f"function {val.name}() has invalid syntax when called")
                 print(val)
-            return NothingValue(None)
+            return NOTHING
         
         def builtin_int(interpreter, args):
             if not args:
                 raise Exception("int() needs 1 argument")
             elif len(args) > 1:
                 raise Exception("int() only takes in 1 argument")
-            return IntValue(int(getattr(args[0], 'value', args[0])))
+            return int_value(int(getattr(args[0], 'value', args[0])))
         
         def builtin_float(interpreter, args):
             if not args:
@@ -418,14 +526,14 @@ class Interpreter:
                 raise Exception("size() needs 1 argument")
             elif len(args) > 1:
                 raise Exception("size() only takes in 1 argument")
-            return len(getattr(args[0], 'value', args[0]))
+            return int_value(len(getattr(args[0], 'value', args[0])))
         
         def builtin_ask(interpreter, args):
             if not args:
                 raise Exception("ask() needs 1 argument")
             elif len(args) > 1:
                 raise Exception("ask() only takes in 1 argument")
-            return input(args[0])
+            return StringValue(input(getattr(args[0], 'value', args[0])))
         
         def builtin_terminate(interpreter, args):
             if args:
@@ -438,13 +546,86 @@ class Interpreter:
             if len(args) != 2:
                 raise Exception("find() takes in exactly 2 arguments")
             
-            element = getattr(args[1], 'value', args[1])
-            target = getattr(args[0], 'value', args[0])
-
-            if type(element) != str:
-                raise Exception("find() only takes in string values as arguments")
-            
-            return element in target
+            return bool_value(contains(args[0], args[1]))
+
+        def builtin_set(interpreter, args):
+            if len(args) > 1:
+                raise Exception("set() takes 0 or 1 arguments: (values)")
+            return make_set(iterate(args[0]) if args else ())
+
+        def builtin_memoize(interpreter, args):
+            if len(args) not in (1, 2):
+                raise Exception("memoize() takes 1 or 2 arguments: (function, maxsize)")
+            func = args[0]
+            if not isinstance(func, (FunctionValue, BuiltInFunctionValue)):
+                raise Exception("memoize() only takes in a function")
+
+            maxsize = MEMO_DEFAULT_SIZE
+            if len(args) == 2:
+                maxsize = getattr(args[1], 'value', args[1])
+                if isinstance(args[1], NothingValue):
+                    maxsize = None
+                elif type(maxsize) != int or maxsize < 1:
+                    raise Exception("memoize(): maxsize must be a positive integer or Nothing")
+            return MemoizedFunctionValue(func.name, func, maxsize)
+
+        def memoized_argument(name, args):
+            if len(args) != 1:
+                raise Exception(f"{name}() takes in exactly 1 argument")
+            if not isinstance(args[0], MemoizedFunctionValue):
+                raise Exception(f"{name}() only takes in a memoized function")
+            return args[0]
+
+        def builtin_memo_stats(interpreter, args):
+            func = memoized_argument("memo_stats", args)
+            maxsize = NOTHING if func.maxsize is None else int_value(func.maxsize)
+            return [int_value(func.hits), int_value(func.misses), int_value(len(func.cache)), maxsize]
+
+        def builtin_memo_clear(interpreter, args):
+            memoized_argument("memo_clear", args).clear()
+            return NOTHING
+
+        def builtin_range(interpreter, args):
+            if len(args) not in (1, 2, 3):
+                raise Exception("range() takes 1 to 3 arguments: (start, stop, step)")
+            bounds = [getattr(arg, 'value', arg) for arg in args]
+            if any(type(bound) != int for bound in bounds):
+                raise Exception("range() only takes in integers")
+            if len(bounds) == 3 and bounds[2] == 0:
+                raise Exception("range(): step cannot be zero")
+            return range(*bounds)
+
+        def builtin_builder(interpreter, args):
+            if args:
+                raise Exception("builder() takes exactly no arguments")
+            return StringBuilderValue()
+
+        def builtin_join(interpreter, args):
+            if len(args) not in (1, 2):
+                raise Exception("join() takes 1 or 2 arguments: (array, separator)")
+            items = args[0]
+            if not isinstance(items, (list, TypedArray, ArrayView)):
+                raise Exception("join() only takes in an array to join")
+            separator = getattr(args[1], 'value', args[1]) if len(args) == 2 else ""
+            if type(separator) != str:
+                raise Exception("join(): separator must be a string")
+            return StringValue(separator.join([str(getattr(item, 'value', item)) for item in items]))
+
+        def typed_array_builtin(kind):
+            name = f"{kind}_array"
+
+            def builtin_typed_array(interpreter, args):
+                if len(args) != 1:
+                    raise Exception(f"{name}() takes in exactly 1 argument")
+                source = getattr(args[0], 'value', args[0])
+                if isinstance(source, (list, TypedArray, ArrayView)):
+                    return pack_array(source, kind)
+                if type(source) != int or source < 0:
+                    raise Exception(f"{name}() takes in an array or a non-negative size")
+                arr = TypedArray(ARRAY_TYPECODES[kind])
+                arr.frombytes(bytes(source * arr.itemsize))
+                return arr
+            return BuiltInFunctionValue(name, builtin_typed_array)
 
         # def builtin_sqrt(interpreter, args):
         #     values = 
@@ -456,4 +637,13 @@ class Interpreter:
         self.env.declare("size", BuiltInFunctionValue("size", builtin_size))
         self.env.declare("ask", BuiltInFunctionValue("ask", builtin_ask))
         self.env.declare("terminate", BuiltInFunctionValue("terminate", builtin_terminate))
-        self.env.declare("find", BuiltInFunctionValue("find", builtin_find))
\ No newline at end of file
+        self.env.declare("find", BuiltInFunctionValue("find", builtin_find))
+        self.env.declare("set", BuiltInFunctionValue("set", builtin_set))
+        self.env.declare("range", BuiltInFunctionValue("range", builtin_range))
+        self.env.declare("builder", BuiltInFunctionValue("builder", builtin_builder))
+        self.env.declare("join", BuiltInFunctionValue("join", builtin_join))
+        self.env.declare("int_array", typed_array_builtin("int"))
+        self.env.declare("float_array", typed_array_builtin("float"))
+        self.env.declare("memoize", BuiltInFunctionValue("memoize", builtin_memoize))
+        self.env.declare("memo_stats", BuiltInFunctionValue("memo_stats", builtin_memo_stats))
+        self.env.declare("memo_clear", BuiltInFunctionValue("memo_clear", builtin_memo_clear))
\ No newline at end of file
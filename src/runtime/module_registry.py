@@ -0,0 +1,88 @@
+import os
+import importlib
+from runtime.values_ import ModuleValue
+
+STDLIB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules")
+
+# Name -> (Python module, builder). Built on first import, then shared by the whole process
+STDLIB_MODULES = {
+    "math": ("runtime.modules.math", "build_math_module"),
+    "io": ("runtime.modules.io", "build_io_module"),
+}
+
+STDLIB_CACHE = {}
+RESOLVE_CACHE = {}
+
+def default_search_path():
+    search_path = [os.getcwd()]
+    for entry in os.environ.get("ORION_PATH", "").split(os.pathsep):
+        if entry:
+            search_path.append(os.path.abspath(entry))
+    search_path.append(STDLIB_DIR)
+    return search_path
+
+def load_stdlib_module(name):
+    module = STDLIB_CACHE.get(name)
+    if module is None:
+        module_name, builder = STDLIB_MODULES[name]
+        module = ModuleValue(name, getattr(importlib.import_module(module_name), builder)())
+        STDLIB_CACHE[name] = module
+    return module
+
+class ModuleRegistry:
+    """
+    Resolves and loads the modules imported by one interpreter.
+
+    Every module is executed at most once: later imports of the same file,
+    under any alias, return the ModuleValue already in the registry. .or
+    files are looked up along search_path (the working directory, the
+    entries of ORION_PATH, then the stdlib directory) and where each one was
+    found is remembered for the rest of the process. Python stdlib modules come from
+    STDLIB_MODULES and are only built when first imported.
+    """
+    def __init__(self, search_path=None):
+        self.search_path = search_path if search_path is not None else default_search_path()
+        self.modules = {}
+
+    def raise_error(self, message):
+        raise Exception(message)
+
+    def add_search_dir(self, directory):
+        directory = os.path.abspath(directory)
+        if directory not in self.search_path:
+            self.search_path.insert(1, directory)
+
+    def resolve(self, path):
+        relative_path = os.path.join(*path.replace("\\", "/").split("/")) + ".or"
+        key = (tuple(self.search_path), relative_path)
+        filename = RESOLVE_CACHE.get(key)
+        if filename is not None:
+            return filename
+
+        for directory in self.search_path:
+            candidate = os.path.join(directory, relative_path)
+            if os.path.isfile(candidate):
+                # Misses are not cached: the file may still be created later in the same REPL or server
+                RESOLVE_CACHE[key] = candidate
+                return candidate
+        return None
+
+    def load(self, interpreter, name, path):
+        if path in STDLIB_MODULES:
+            return load_stdlib_module(path)
+
+        filename = self.resolve(path)
+        if filename is None:
+            self.raise_error(f"Unable to import '{path}.or'")
+
+        module = self.modules.get(filename)
+        if module is None:
+            # Registered before running so circular imports see the partial module
+            module = interpreter.create_module(name)
+            self.modules[filename] = module
+            try:
+                interpreter.execute_module(module, filename)
+            except BaseException:
+                del self.modules[filename]
+                raise
+        return module
@@ -0,0 +1,216 @@
+import os
+import mmap
+import atexit
+import weakref
+from ..values_ import *
+
+# Bytes buffered by a file before anything reaches the disk
+WRITE_BUFFER_SIZE = 1 << 20
+READ_BUFFER_SIZE = 1 << 16
+FILE_MODES = ("r", "w", "a")
+
+# Files a script has opened and not closed yet
+OPEN_FILES = weakref.WeakSet()
+
+def close_open_files(keep_open=False):
+    """
+    Flushes and closes every file a script left open. With keep_open (the
+    REPL, whose later entries may still use them) they are only flushed.
+    """
+    for file in list(OPEN_FILES):
+        if keep_open:
+            if file.mode != "r":
+                file.file.flush()
+        else:
+            file.close()
+
+atexit.register(close_open_files)
+
+def text_of(value):
+    return str(getattr(value, 'value', value))
+
+def check_argument_count(name, args, counts):
+    if len(args) not in counts:
+        expected = " or ".join(str(count) for count in counts)
+        raise Exception(f"{name}() takes {expected} argument{'' if counts == (1,) else 's'} ({len(args)} given)")
+
+def int_argument(name, value):
+    value = getattr(value, 'value', value)
+    if type(value) != int or value < 0:
+        raise Exception(f"{name}() only accepts non-negative integers, not '{value}'")
+    return value
+
+class FileValue:
+    """
+    An open text file from io.open(). Reading goes one line or one chunk
+    at a time through Python's buffered reader, so a file of any size is
+    never held in memory at once. Iterating it yields its lines.
+    """
+    __slots__ = ('path', 'mode', 'file', 'pending', '__weakref__')
+
+    def __init__(self, path, mode):
+        self.path = path
+        self.mode = mode
+        buffering = READ_BUFFER_SIZE if mode == "r" else WRITE_BUFFER_SIZE
+        self.file = open(path, mode, buffering=buffering, encoding="utf-8", newline=None)
+        # One line read ahead by at_end(), handed out before anything else is read
+        self.pending = None
+        OPEN_FILES.add(self)
+
+    def __iter__(self):
+        while True:
+            line = self.next_line()
+            if not line:
+                return
+            yield StringValue(line.rstrip("\n"))
+
+    def __repr__(self):
+        return (f"<file {self.path}>")
+
+    def check_mode(self, method, reading):
+        if self.file.closed:
+            raise Exception(f"{method}(): file '{self.path}' is closed")
+        if reading != (self.mode == "r"):
+            raise Exception(f"{method}(): file '{self.path}' is not open for {'reading' if reading else 'writing'}")
+
+    def close(self):
+        OPEN_FILES.discard(self)
+        self.file.close()
+
+    def next_line(self):
+        if self.pending is not None:
+            line, self.pending = self.pending, None
+            return line
+        return self.file.readline()
+
+    def call_method(self, method, args):
+        match(method):
+            case 'read_line':
+                check_argument_count(method, args, (0,))
+                self.check_mode(method, True)
+                line = self.next_line()
+                return StringValue(line.rstrip("\n")) if line else NOTHING
+
+            case 'read':
+                check_argument_count(method, args, (1,))
+                self.check_mode(method, True)
+                size = int_argument(method, args[0])
+                text = ""
+                if self.pending is not None:
+                    text, self.pending = self.pending[:size], self.pending[size:] or None
+                if len(text) < size:
+                    text += self.file.read(size - len(text))
+                return StringValue(text) if text else NOTHING
+
+            case 'at_end':
+                check_argument_count(method, args, (0,))
+                self.check_mode(method, True)
+                if self.pending is None:
+                    self.pending = self.file.readline()
+                return bool_value(self.pending == "")
+
+            case 'write' | 'write_line':
+                self.check_mode(method, False)
+                for arg in args:
+                    self.file.write(text_of(arg))
+                if method == 'write_line':
+                    self.file.write("\n")
+                return NOTHING
+
+            case 'flush':
+                check_argument_count(method, args, (0,))
+                self.check_mode(method, False)
+                self.file.flush()
+                return NOTHING
+
+            case 'close':
+                check_argument_count(method, args, (0,))
+                self.close()
+                return NOTHING
+
+            case _:
+                raise Exception(f"Unknown file method '{method}'")
+
+class MappedFileValue:
+    """
+    A file mapped into memory read-only by io.map(). The operating system
+    pages it in as it is touched, so large inputs can be searched and
+    sliced by byte offset without being read first.
+    """
+    __slots__ = ('path', 'data')
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            # mmap refuses empty files, which have nothing to map anyway
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(path) else b""
+
+    def __len__(self):
+        if self.data is None:
+            raise Exception(f"size(): mapped file '{self.path}' is closed")
+        return len(self.data)
+
+    def __iter__(self):
+        data = self.data
+        start = 0
+        while start < len(data):
+            end = data.find(b"\n", start)
+            if end == -1:
+                end = len(data)
+            yield StringValue(data[start:end].decode("utf-8", errors="replace").rstrip("\r"))
+            start = end + 1
+
+    def __repr__(self):
+        return (f"<mapped file {self.path}>")
+
+    def call_method(self, method, args):
+        if self.data is None:
+            raise Exception(f"{method}(): mapped file '{self.path}' is closed")
+        match(method):
+            case 'read':
+                check_argument_count(method, args, (2,))
+                start, end = int_argument(method, args[0]), int_argument(method, args[1])
+                return StringValue(self.data[start:end].decode("utf-8", errors="replace"))
+
+            case 'find':
+                check_argument_count(method, args, (1, 2))
+                start = int_argument(method, args[1]) if len(args) == 2 else 0
+                return int_value(self.data.find(text_of(args[0]).encode("utf-8"), start))
+
+            case 'close':
+                check_argument_count(method, args, (0,))
+                if isinstance(self.data, mmap.mmap):
+                    self.data.close()
+                self.data = None
+                return NOTHING
+
+            case _:
+                raise Exception(f"Unknown mapped file method '{method}'")
+
+def build_io_module():
+    def io_open(interpreter, args):
+        check_argument_count("io.open", args, (1, 2))
+        mode = text_of(args[1]) if len(args) == 2 else "r"
+        if mode not in FILE_MODES:
+            raise Exception(f"io.open(): mode must be one of {', '.join(FILE_MODES)}, not '{mode}'")
+        try:
+            return FileValue(text_of(args[0]), mode)
+        except OSError as error:
+            raise Exception(f"io.open(): cannot open '{text_of(args[0])}': {error.strerror}")
+
+    def io_map(interpreter, args):
+        check_argument_count("io.map", args, (1,))
+        try:
+            return MappedFileValue(text_of(args[0]))
+        except OSError as error:
+            raise Exception(f"io.map(): cannot map '{text_of(args[0])}': {error.strerror}")
+
+    def io_exists(interpreter, args):
+        check_argument_count("io.exists", args, (1,))
+        return bool_value(os.path.exists(text_of(args[0])))
+
+    return {
+        "open": BuiltInFunctionValue("open", io_open),
+        "map": BuiltInFunctionValue("map", io_map),
+        "exists": BuiltInFunctionValue("exists", io_exists),
+    }
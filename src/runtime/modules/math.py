@@ -7,7 +7,7 @@ def build_math_module():
             if type(args[0].value) not in (int, float):
                 raise Exception(f"math.sqrt() only accepts integers or floats, not {type(args[0])}")
             
-            return math.sqrt(args[0].value)
+            return FloatValue(math.sqrt(args[0].value))
         else:
             raise Exception(f"math.sqrt() only accepts 1 argument ({len(args)} given)")
         
@@ -19,6 +19,6 @@ def build_math_module():
 
     return {
         "sqrt": BuiltInFunctionValue("sqrt", math_sqrt),
-        "pi": VariableValue(math_pi()),
-        "e": VariableValue(math_eulers_number())
+        "pi": FloatValue(math_pi()),
+        "e": FloatValue(math_eulers_number())
     }
\ No newline at end of file
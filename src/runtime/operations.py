@@ -0,0 +1,549 @@
+from lexer import TokenType
+from runtime.values_ import *
+from itertools import repeat
+import operator
+
+# Operator and container semantics shared by every execution engine, so the
+# tree-walking interpreter and the compiled engines cannot drift apart.
+
+def raise_error(message):
+    raise Exception(message)
+
+def check_operands(left, right):
+    if left is None or right is None:
+        raise TypeError(f"Cannot perform operations with 'Nothing' type")
+
+# Shorter strings are cheaper to copy than to keep as pieces
+CONCAT_MIN_LENGTH = 256
+
+def concat_strings(left, text):
+    # `s = s + piece` in a loop appends to the pieces behind s instead of copying s every time
+    if left.__class__ is ConcatStringValue:
+        parts = left.parts
+        if left.count == len(parts):
+            parts.append(text)
+            return ConcatStringValue(parts, left.count + 1)
+        # Something else was already appended to this string: start a new list from its text
+        return ConcatStringValue([left.value, text], 2)
+    if len(left.value) < CONCAT_MIN_LENGTH:
+        return StringValue(left.value + text)
+    return ConcatStringValue([left.value, text], 2)
+
+def check_vector_operand(value):
+    if value.__class__ is not int and value.__class__ is not float:
+        raise_error(f"Cannot perform operations between an array and '{value}'")
+
+def vector_op(operation, left, right, typecode=None):
+    # Elementwise arithmetic on typed arrays runs in map(), not in an Orion loop
+    if left.__class__ is TypedArray and right.__class__ is TypedArray:
+        if len(left) != len(right):
+            raise_error(f"Cannot perform operations between arrays of sizes {len(left)} and {len(right)}")
+        values = map(operation, left, right)
+        is_float = left.typecode == 'd' or right.typecode == 'd'
+    elif left.__class__ is TypedArray:
+        check_vector_operand(right)
+        values = map(operation, left, repeat(right))
+        is_float = left.typecode == 'd' or right.__class__ is float
+    else:
+        check_vector_operand(left)
+        values = map(operation, repeat(left), right)
+        is_float = right.typecode == 'd' or left.__class__ is float
+
+    if typecode is None:
+        typecode = 'd' if is_float else 'q'
+    try:
+        return TypedArray(typecode, values)
+    except ZeroDivisionError:
+        raise ZeroDivisionError("Cannot divide by zero")
+    except OverflowError:
+        raise_error("Integer is too large for an int array")
+
+def op_add(left, right):
+    if left.__class__ is IntValue and right.__class__ is IntValue:
+        value = left.value + right.value
+        if SMALL_INT_MIN <= value <= SMALL_INT_MAX:
+            return SMALL_INTS[value - SMALL_INT_MIN]
+        return IntValue(value)
+    if isinstance(left, StringValue):
+        right = getattr(right, 'value', right)
+        check_operands(left, right)
+        return concat_strings(left, str(right))
+    left = getattr(left, 'value', left)
+    right = getattr(right, 'value', right)
+    check_operands(left, right)
+    if isinstance(left, str) or isinstance(right, str):
+        return StringValue(str(left)+str(right))
+    if left.__class__ is TypedArray or right.__class__ is TypedArray:
+        return vector_op(operator.add, left, right)
+    return make_value(left+right)
+
+def op_sub(left, right):
+    if left.__class__ is IntValue and right.__class__ is IntValue:
+        value = left.value - right.value
+        if SMALL_INT_MIN <= value <= SMALL_INT_MAX:
+            return SMALL_INTS[value - SMALL_INT_MIN]
+        return IntValue(value)
+    left = getattr(left, 'value', left)
+    right = getattr(right, 'value', right)
+    check_operands(left, right)
+    if left.__class__ is TypedArray or right.__class__ is TypedArray:
+        return vector_op(operator.sub, left, right)
+    return make_value(left-right)
+
+def op_mul(left, right):
+    if left.__class__ is IntValue and right.__class__ is IntValue:
+        value = left.value * right.value
+        if SMALL_INT_MIN <= value <= SMALL_INT_MAX:
+            return SMALL_INTS[value - SMALL_INT_MIN]
+        return IntValue(value)
+    left = getattr(left, 'value', left)
+    right = getattr(right, 'value', right)
+    check_operands(left, right)
+    if left.__class__ is TypedArray or right.__class__ is TypedArray:
+        return vector_op(operator.mul, left, right)
+    return make_value(left*right)
+
+def op_div(left, right):
+    left = getattr(left, 'value', left)
+    right = getattr(right, 'value', right)
+    check_operands(left, right)
+    if left.__class__ is TypedArray or right.__class__ is TypedArray:
+        return vector_op(operator.truediv, left, right, 'd')
+    if right != 0: return make_value(left/right)
+    else: raise ZeroDivisionError("Cannot divide by zero")
+
+def op_eq(left, right):
+    return bool(getattr(left, 'value', left) == getattr(right, 'value', right))
+
+def op_noteq(left, right):
+    return bool(getattr(left, 'value', left) != getattr(right, 'value', right))
+
+def op_gt(left, right):
+    return bool(getattr(left, 'value', left) > getattr(right, 'value', right))
+
+def op_lt(left, right):
+    return bool(getattr(left, 'value', left) < getattr(right, 'value', right))
+
+def op_gteq(left, right):
+    return bool(getattr(left, 'value', left) >= getattr(right, 'value', right))
+
+def op_lteq(left, right):
+    return bool(getattr(left, 'value', left) <= getattr(right, 'value', right))
+
+BINARY_OPS = {
+    TokenType.PLUS: op_add,
+    TokenType.MINUS: op_sub,
+    TokenType.MUL: op_mul,
+    TokenType.DIV: op_div,
+    TokenType.EQEQ: op_eq,
+    TokenType.NOTEQ: op_noteq,
+    TokenType.GT: op_gt,
+    TokenType.LT: op_lt,
+    TokenType.GTEQ: op_gteq,
+    TokenType.LTEQ: op_lteq,
+}
+
+def op_pos(operand):
+    if isinstance(operand, (IntValue, FloatValue, TypedArray)):
+        return operand
+
+def op_neg(operand):
+    if isinstance(operand, IntValue):
+        return int_value(operand.value * -1)
+    elif isinstance(operand, FloatValue):
+        return FloatValue(operand.value * -1)
+    elif operand.__class__ is TypedArray:
+        return TypedArray(operand.typecode, map(operator.neg, operand))
+
+UNARY_OPS = {
+    '+': op_pos,
+    '-': op_neg,
+}
+
+# LOOPS
+INT_COMPARISONS = {
+    TokenType.LT: operator.lt,
+    TokenType.LTEQ: operator.le,
+    TokenType.GT: operator.gt,
+    TokenType.GTEQ: operator.ge,
+}
+
+def iterate(value):
+    # What `for x in value` walks over, as Orion values
+    value_type = value.__class__
+    if value_type is list or value_type is ArrayView:
+        return iter(value)
+    if value_type is range:
+        return map(int_value, value)
+    if value_type is TypedArray:
+        return map(make_value, value)
+    if value_type is MapValue or value_type is SetValue:
+        return map(key_value, list(value))
+    if isinstance(value, StringValue):
+        return map(StringValue, value.value)
+    if hasattr(value, '__iter__') and not isinstance(value, (str, bool)):
+        return iter(value)
+    raise_error(f"Cannot iterate over '{value}'")
+
+def counted_values(start, limit, comparison, counted):
+    """
+    The values the variable of a counted for loop takes, given its start
+    value. limit is the bound as an IntValue when it is a constant, or a
+    function returning its current value when it is a variable, which is
+    then read again before every round just as the condition would be.
+    """
+    step, offset, kind = counted
+    if start.__class__ is IntValue:
+        if limit.__class__ is IntValue:
+            return map(int_value, range(start.value, limit.value + offset, step))
+        return counted_ints(start.value, limit, comparison, step)
+    if limit.__class__ is IntValue:
+        bound = limit
+        limit = lambda: bound
+    return counted_other(start, limit, comparison, step, kind)
+
+def counted_ints(i, limit, comparison, step):
+    compare = INT_COMPARISONS[comparison]
+    compare_values = BINARY_OPS[comparison]
+    while True:
+        bound = limit()
+        if bound.__class__ is IntValue:
+            if not compare(i, bound.value):
+                return
+        elif not compare_values(int_value(i), bound):
+            return
+        yield int_value(i)
+        i += step
+
+def counted_other(value, limit, comparison, step, kind):
+    # Floats and anything else keep the exact semantics of the condition and increment nodes
+    compare_values = BINARY_OPS[comparison]
+    while compare_values(value, limit()):
+        yield value
+        if kind == "step":
+            value = step_value(value, step)
+        elif kind == "add":
+            value = op_add(value, int_value(step))
+        else:
+            value = op_sub(value, int_value(-step))
+
+def step_value(value, step):
+    # ++/-- rebind the variable to a new value, values themselves are immutable
+    if isinstance(value, IntValue):
+        return int_value(value.value + step)
+    elif isinstance(value, FloatValue):
+        return FloatValue(value.value + step)
+    return make_value(value + step)
+
+def literal_value(token):
+    if token.type == TokenType.INT:
+        return int_value(token.value)
+    elif token.type == TokenType.FLOAT:
+        return FloatValue(token.value)
+    elif token.type == TokenType.STRING:
+        return StringValue(token.value)
+    elif token.type == TokenType.BOOL:
+        return bool_value(token.value)
+
+# CONTAINERS
+def pack_element(arr, value):
+    # Unboxes a value for storage in a typed array, refusing anything the array cannot hold
+    raw = getattr(value, 'value', value)
+    if arr.typecode == 'q':
+        if raw.__class__ is not int:
+            raise_error(f"Cannot store '{value}' in an int array")
+        if not INT_ARRAY_MIN <= raw <= INT_ARRAY_MAX:
+            raise_error("Integer is too large for an int array")
+    elif raw.__class__ is not int and raw.__class__ is not float:
+        raise_error(f"Cannot store '{value}' in a float array")
+    return raw
+
+def pack_array(elements, kind):
+    arr = TypedArray(ARRAY_TYPECODES[kind])
+    arr.extend([pack_element(arr, element) for element in elements])
+    return arr
+
+def check_index(arr, index):
+    if not isinstance(arr, (list, TypedArray, ArrayView)):
+        raise_error("Cannot index non-list")
+    if not isinstance(index, int):
+        raise_error("Cannot index with non-integer")
+    if not -len(arr) <= index < len(arr):
+        raise_error("Index is out of range")
+
+def index_get(arr, index):
+    if arr.__class__ is MapValue:
+        return map_get(arr, index)
+    index = index.value
+    check_index(arr, index)
+    if arr.__class__ is list:
+        return arr[index]
+    if arr.__class__ is ArrayView:
+        # Views index their parent, offset by where they start
+        index = arr.start + (index if index >= 0 else index + len(arr))
+        arr = arr.base
+    if arr.__class__ is TypedArray:
+        return make_value(arr[index])
+    return arr[index]
+
+def index_set(arr, index, value):
+    if arr.__class__ is MapValue:
+        arr[map_key(index)] = value
+        return value
+    index = index.value
+    check_index(arr, index)
+    if arr.__class__ is ArrayView:
+        index = arr.start + (index if index >= 0 else index + len(arr))
+        arr = arr.base
+    if arr.__class__ is TypedArray:
+        arr[index] = pack_element(arr, value)
+    else:
+        arr[index] = value
+    return value
+
+def slice_bound(value, default, length):
+    if value.__class__ is NothingValue:
+        return default
+    bound = getattr(value, 'value', value)
+    if bound.__class__ is not int:
+        raise_error("Cannot slice with non-integer")
+    if bound < 0:
+        bound += length
+    return min(max(bound, 0), length)
+
+def slice_array(arr, start, end):
+    # a[start:end] shares the parent's storage; bounds are clamped like Python's
+    if not isinstance(arr, (list, TypedArray, ArrayView)):
+        raise_error("Cannot slice non-list")
+    length = len(arr)
+    start = slice_bound(start, 0, length)
+    stop = max(slice_bound(end, length, length), start)
+    if arr.__class__ is ArrayView:
+        return ArrayView(arr.base, arr.start + start, arr.start + stop)
+    return ArrayView(arr, start, stop)
+
+def copy_array(arr):
+    if arr.__class__ is ArrayView:
+        base = arr.base
+        if base.__class__ is TypedArray:
+            return TypedArray(base.typecode, base[arr.start:arr.stop])
+        return base[arr.start:arr.stop]
+    if arr.__class__ is TypedArray:
+        return TypedArray(arr.typecode, arr)
+    return list(arr)
+
+def array_method(arr, method, args):
+    packed = arr.__class__ is TypedArray
+    if method == 'copy':
+        if args:
+            raise_error("copy() method takes no arguments")
+        return copy_array(arr)
+    if arr.__class__ is ArrayView:
+        raise_error(f"{method}() cannot change the size of a slice, copy() it first")
+    match(method):
+        case 'push':
+            if len(args) < 1:
+                raise_error("push() method takes at least 1 argument")
+
+            for i in args:
+                arr.append(pack_element(arr, i) if packed else i)
+
+        case 'pop':
+            if len(args) > 0:
+                raise_error("pop() method takes no arguments")
+            arr.pop()
+
+        case 'insert':
+            if len(args) != 2:
+                raise_error("insert() method takes exactly 2 arguments: (index, value)")
+
+            idx, value = args
+
+            if not isinstance(idx.value, int):
+                raise_error("insert(): index argument must be an integer")
+            if idx.value < 0 or idx.value >= len(arr):
+                raise_error("insert(): index argument is out of bounds")
+
+            arr.insert(idx.value, pack_element(arr, value) if packed else value)
+
+        case 'delete':
+            if len(args) != 1:
+                raise_error("delete() method takes exactly 1 argument")
+
+            idx = args[0]
+
+            if not isinstance(idx.value, int):
+                raise_error("delete(): index argument must be an integer")
+            if idx.value < 0 or idx.value >= len(arr):
+                raise_error("delete(): index argument is out of bounds")
+
+            arr.pop(idx.value)
+
+        case _:
+            raise_error(f"Unknown array method '{method}'")
+
+def build_map(entries):
+    # entries alternate key, value, as a map literal lists them
+    result = MapValue()
+    for i in range(0, len(entries), 2):
+        result[map_key(entries[i])] = entries[i + 1]
+    return result
+
+def map_get(mapping, key):
+    try:
+        return mapping[map_key(key)]
+    except KeyError:
+        raise_error(f"Key '{key}' is not in the map")
+
+def map_method(mapping, method, args):
+    match(method):
+        case 'get':
+            if len(args) not in (1, 2):
+                raise_error("get() method takes 1 or 2 arguments: (key, default)")
+            return mapping.get(map_key(args[0]), args[1] if len(args) == 2 else NOTHING)
+
+        case 'set':
+            if len(args) != 2:
+                raise_error("set() method takes exactly 2 arguments: (key, value)")
+            mapping[map_key(args[0])] = args[1]
+
+        case 'has':
+            if len(args) != 1:
+                raise_error("has() method takes exactly 1 argument")
+            return bool_value(map_key(args[0]) in mapping)
+
+        case 'delete':
+            if len(args) != 1:
+                raise_error("delete() method takes exactly 1 argument")
+            key = map_key(args[0])
+            if key not in mapping:
+                raise_error(f"delete(): key '{args[0]}' is not in the map")
+            return mapping.pop(key)
+
+        case 'keys':
+            if args:
+                raise_error("keys() method takes no arguments")
+            return [key_value(key) for key in mapping]
+
+        case 'values':
+            if args:
+                raise_error("values() method takes no arguments")
+            return list(mapping.values())
+
+        case _:
+            raise_error(f"Unknown map method '{method}'")
+
+def make_set(values):
+    return SetValue.fromkeys([map_key(value) for value in values])
+
+def set_operand(value, method):
+    # The other side of union/intersection/difference: a set, or anything for-in can walk
+    if value.__class__ is SetValue:
+        return value
+    if isinstance(value, (list, TypedArray, ArrayView, MapValue)):
+        return make_set(iterate(value))
+    raise_error(f"{method}() takes in a set or an array")
+
+def set_method(items, method, args):
+    match(method):
+        case 'add':
+            if len(args) < 1:
+                raise_error("add() method takes at least 1 argument")
+            for value in args:
+                items[map_key(value)] = None
+
+        case 'remove':
+            if len(args) != 1:
+                raise_error("remove() method takes exactly 1 argument")
+            key = map_key(args[0])
+            if key not in items:
+                raise_error(f"remove(): '{args[0]}' is not in the set")
+            del items[key]
+
+        case 'contains':
+            if len(args) != 1:
+                raise_error("contains() method takes exactly 1 argument")
+            return bool_value(map_key(args[0]) in items)
+
+        case 'union' | 'intersection' | 'difference':
+            if len(args) != 1:
+                raise_error(f"{method}() method takes exactly 1 argument")
+            other = set_operand(args[0], method)
+            if method == 'union':
+                result = SetValue(items)
+                result.update(other)
+                return result
+            elif method == 'intersection':
+                return SetValue.fromkeys([key for key in items if key in other])
+            return SetValue.fromkeys([key for key in items if key not in other])
+
+        case 'copy':
+            if args:
+                raise_error("copy() method takes no arguments")
+            return SetValue(items)
+
+        case _:
+            raise_error(f"Unknown set method '{method}'")
+
+def contains(target, element):
+    # find(): hashed for sets, a scan comparing with == for arrays, a substring test for strings
+    if target.__class__ is SetValue:
+        return map_key(element) in target
+    if target.__class__ is TypedArray:
+        return getattr(element, 'value', element) in target
+    if isinstance(target, (list, ArrayView)):
+        return any(op_eq(item, element) for item in target)
+    target = getattr(target, 'value', target)
+    element = getattr(element, 'value', element)
+    if type(target) != str or type(element) != str:
+        raise_error("find() takes in a string, array or set, and a string to find in a string")
+    return element in target
+
+def builder_method(builder, method, args):
+    match(method):
+        case 'append':
+            if len(args) < 1:
+                raise_error("append() method takes at least 1 argument")
+            for arg in args:
+                text = str(getattr(arg, 'value', arg))
+                builder.parts.append(text)
+                builder.length += len(text)
+            return builder
+
+        case 'build':
+            if args:
+                raise_error("build() method takes no arguments")
+            text = ''.join(builder.parts)
+            # Later appends start from the joined text instead of joining everything again
+            builder.parts = [text] if text else []
+            return StringValue(text)
+
+        case 'clear':
+            if args:
+                raise_error("clear() method takes no arguments")
+            builder.parts = []
+            builder.length = 0
+
+        case _:
+            raise_error(f"Unknown builder method '{method}'")
+
+def call_method(obj, method, args):
+    if isinstance(obj, (list, TypedArray, ArrayView)):
+        return array_method(obj, method, args)
+    if obj.__class__ is MapValue:
+        return map_method(obj, method, args)
+    if obj.__class__ is SetValue:
+        return set_method(obj, method, args)
+    if obj.__class__ is StringBuilderValue:
+        return builder_method(obj, method, args)
+    # Values made by stdlib modules (io files, ...) carry their own methods
+    methods = getattr(obj, 'call_method', None)
+    if methods is not None:
+        return methods(method, args)
+
+    raise Exception(f"'{method}' cannot be called on this type")
+
+def bound_method(obj, method):
+    def call_bound(interpreter, args):
+        return call_method(obj, method, args)
+    return BuiltInFunctionValue(method, call_bound)
@@ -0,0 +1,207 @@
+import json
+import time
+import marshal
+from runtime.values_ import *
+from tree import *
+from runtime.interpreter import Interpreter
+from runtime.operations import call_method
+
+# Timing a call costs Python frames, so the recursion limit is raised this much while profiling
+PROFILING_STACK_FACTOR = 2
+
+class FunctionStats:
+    __slots__ = ('name', 'kind', 'line', 'calls', 'inclusive', 'exclusive', 'active', 'callers')
+
+    def __init__(self, name, kind, line=None):
+        self.name = name
+        self.kind = kind
+        self.line = line
+        self.calls = 0
+        self.inclusive = 0.0
+        self.exclusive = 0.0
+        self.active = 0
+        # Caller's stats (None for top-level code) -> [calls, exclusive, inclusive]
+        self.callers = {}
+
+class Profiler:
+    """
+    Collects the numbers behind `orion --profile`.
+
+    Phases are timed by the caller through phase(). Calls are timed by
+    ProfilingInterpreter through call(): inclusive time covers everything
+    a function did, exclusive time leaves out the functions it called, and
+    recursive calls only count towards the inclusive time of the outermost
+    one. The node histogram counts every visit() by node type.
+    """
+    def __init__(self, filename="<script>"):
+        self.filename = filename
+        self.phases = {}
+        self.functions = {}
+        self.node_counts = {}
+        # One entry per active call: [stats, time spent in child calls]
+        self.stack = []
+
+    def phase(self, name, start):
+        self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def call(self, interpreter, func, args, name=None):
+        if isinstance(func, MemoizedFunctionValue):
+            # Only the cache lookup; the wrapped function is timed under its own entry when it runs
+            kind = "memo"
+        elif isinstance(func, BuiltInFunctionValue):
+            kind = "builtin"
+        elif isinstance(func, FunctionValue):
+            kind = "function"
+        else:
+            return func.call(interpreter, args)
+
+        name = name or func.name
+        # Functions sharing a name (nested helpers, module functions) are told apart by where they were defined
+        line = getattr(func.func if kind == "memo" else func, 'line', None)
+        key = (kind, name, line)
+        stats = self.functions.get(key)
+        if stats is None:
+            stats = self.functions[key] = FunctionStats(name, kind, line)
+
+        entry = [stats, 0.0]
+        self.stack.append(entry)
+        stats.active += 1
+        start = time.perf_counter()
+        try:
+            if func.__class__ is FunctionValue:
+                return Interpreter.call_function(interpreter, func, args)
+            return func.call(interpreter, args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stack.pop()
+            stats.active -= 1
+            stats.calls += 1
+            own = elapsed - entry[1]
+            stats.exclusive += own
+            if not stats.active:
+                stats.inclusive += elapsed
+
+            caller = self.stack[-1][0] if self.stack else None
+            totals = stats.callers.setdefault(caller, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += own
+            totals[2] += elapsed
+            if self.stack:
+                self.stack[-1][1] += elapsed
+
+    # REPORTS
+    def report(self):
+        functions = sorted(self.functions.values(), key=lambda stats: stats.exclusive, reverse=True)
+        nodes = sorted(self.node_counts.items(), key=lambda item: item[1], reverse=True)
+        return {
+            "file": self.filename,
+            "phases": dict(self.phases),
+            "functions": [
+                {
+                    "name": stats.name,
+                    "kind": stats.kind,
+                    "line": stats.line,
+                    "calls": stats.calls,
+                    "inclusive": stats.inclusive,
+                    "exclusive": stats.exclusive,
+                    "callers": [
+                        {"name": caller.name if caller else "<module>", "line": caller.line if caller else None, "calls": totals[0]}
+                        for caller, totals in stats.callers.items()
+                    ],
+                }
+                for stats in functions
+            ],
+            "nodes": {name: count for name, count in nodes},
+        }
+
+    def summary(self, limit=20):
+        report = self.report()
+        lines = [f"profile of {report['file']}", "", f"{'phase':<12}{'ms':>12}"]
+        for phase, seconds in report["phases"].items():
+            lines.append(f"{phase:<12}{seconds*1000:>12.3f}")
+
+        lines += ["", f"{'calls':>9}{'excl ms':>12}{'incl ms':>12}{'per call us':>13}  function"]
+        for entry in report["functions"][:limit]:
+            per_call = entry["inclusive"] / entry["calls"] * 1e6 if entry["calls"] else 0.0
+            name = f"{entry['name']}()" if entry["kind"] == "function" else f"<{entry['kind']} {entry['name']}>"
+            if entry["line"] is not None:
+                name += f" line {entry['line']}"
+            lines.append(f"{entry['calls']:>9}{entry['exclusive']*1000:>12.3f}{entry['inclusive']*1000:>12.3f}{per_call:>13.2f}  {name}")
+
+        total = sum(report["nodes"].values())
+        lines += ["", f"{'visits':>11}{'%':>7}  node"]
+        for name, count in list(report["nodes"].items())[:limit]:
+            lines.append(f"{count:>11}{count*100/total:>7.1f}  {name}")
+        return "\n".join(lines)
+
+    def pstats_key(self, stats):
+        # Functions point at the line they were defined on; builtins have none, like cProfile's
+        if stats is None:
+            return (self.filename, 0, "<module>")
+        if stats.kind != "function":
+            return ("~", 0, f"<{stats.kind} {stats.name}>")
+        return (self.filename, stats.line or 0, stats.name)
+
+    def pstats_data(self):
+        # The dict marshalled by cProfile.Profile.dump_stats: (file, line, name) ->
+        # (primitive calls, calls, exclusive, inclusive, {caller: (same four)})
+        data = {}
+        for stats in self.functions.values():
+            callers = {}
+            for caller, (calls, exclusive, inclusive) in stats.callers.items():
+                callers[self.pstats_key(caller)] = (calls, calls, exclusive, inclusive)
+            data[self.pstats_key(stats)] = (stats.calls, stats.calls, stats.exclusive, stats.inclusive, callers)
+        return data
+
+    def save(self, path):
+        # .prof/.pstats files load with pstats.Stats(path), anything else is JSON
+        if path.endswith((".prof", ".pstats")):
+            with open(path, 'wb') as file:
+                marshal.dump(self.pstats_data(), file)
+        else:
+            with open(path, 'w') as file:
+                json.dump(self.report(), file, indent=2)
+                file.write("\n")
+
+class ProfilingInterpreter(Interpreter):
+    """
+    Tree interpreter that reports to a Profiler.
+
+    Only used by --profile: the plain Interpreter keeps its own visit and
+    call paths, so leaving profiling off costs nothing.
+    """
+    def __init__(self, profiler):
+        self.profiler = profiler
+        super().__init__()
+
+    def visit(self, node):
+        # Counts and dispatches in one Python frame, like Interpreter.visit
+        name = node.__class__.__name__
+        counts = self.profiler.node_counts
+        counts[name] = counts.get(name, 0) + 1
+        return getattr(self, f'visit_{name}', self.no_visit_method)(node)
+
+    execute = visit
+
+    def visit_FunctionCallNode(self, node):
+        func = self.lookup(node.name.value, node.depth, node.slot)
+        arg_values = [self.visit(arg) for arg in node.args]
+        return self.profiler.call(self, func, arg_values)
+
+    def call_function(self, func, arg_values):
+        # Calls that do not start at a call node (a memoized function running, a callback) are timed too
+        return self.profiler.call(self, func, arg_values)
+
+    def visit_AttributeAccessNode(self, node):
+        if not isinstance(node.attr, FunctionCallNode):
+            return Interpreter.visit_AttributeAccessNode(self, node)
+
+        obj = self.visit(node.obj)
+        name = node.attr.name.value
+        if not isinstance(obj, ModuleValue):
+            return call_method(obj, name, [self.visit(arg) for arg in node.attr.args])
+        func = obj.get(name)
+        arg_values = [self.visit(arg) for arg in node.attr.args]
+        if isinstance(func, (FunctionValue, BuiltInFunctionValue)):
+            return self.profiler.call(self, func, arg_values, f"{obj.name}.{name}")
+        raise Exception(f"Invalid function call on '{name}()'")
@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+
+HOOK_EVENTS = ("call", "return", "statement", "exception")
+
+@dataclass(slots=True)
+class TraceEvent:
+    """
+    What a hook registered with Interpreter.add_hook receives.
+
+    call:      node, name, args
+    return:    node, name, args, value, elapsed (seconds), error if the call raised
+    statement: node, before it runs
+    exception: node, error, for the statement the error was raised in
+    depth is the number of Orion calls active around the event.
+    """
+    event: str
+    node: any
+    name: str = None
+    args: list = None
+    value: any = None
+    elapsed: float = None
+    error: BaseException = None
+    depth: int = 0
+
+    def __repr__(self):
+        return (f"<{self.event} {self.name or self.node.__class__.__name__}>")
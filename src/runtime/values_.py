@@ -1,6 +1,12 @@
-from dataclasses import dataclass
+from array import array
+from itertools import islice
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from runtime.environment import Frame
 
 class ModuleValue:
+    __slots__ = ('name', 'env')
+
     def __init__(self, name, env):
         self.name = name
         self.env = env    
@@ -11,7 +17,7 @@ class ModuleValue:
     def __repr__(self):
         return (f"<module {self.name}>")
 
-@dataclass
+@dataclass(slots=True)
 class BuiltInFunctionValue:
     name: any
     func: any
@@ -22,39 +28,127 @@ class BuiltInFunctionValue:
     def __repr__(self):
         return (f"<builtin {self.name}>")
 
-@dataclass
+# Cache size used when memoize() is not given one
+MEMO_DEFAULT_SIZE = 1024
+
+@dataclass(slots=True)
+class MemoizedFunctionValue(BuiltInFunctionValue):
+    """
+    Wraps a function value (in func) and caches its results by argument
+    values, evicting the least recently used entry once more than maxsize
+    are held. A maxsize of None never evicts.
+    """
+    maxsize: int = MEMO_DEFAULT_SIZE
+    cache: OrderedDict = field(default_factory=OrderedDict)
+    hits: int = 0
+    misses: int = 0
+
+    def call(self, interpreter, args):
+        for arg in args:
+            if arg.__class__ not in MEMO_KEY_TYPES:
+                # Arrays, maps, sets, builders and files can change between calls, so those calls always run
+                return self.func.call(interpreter, args)
+
+        key = tuple(args)
+        cache = self.cache
+        try:
+            value = cache[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            cache.move_to_end(key)
+            return value
+
+        self.misses += 1
+        value = self.func.call(interpreter, args)
+        cache[key] = value
+        if self.maxsize is not None and len(cache) > self.maxsize:
+            cache.popitem(last=False)
+        return value
+
+    def clear(self):
+        self.cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return (f"<memo {self.name}>")
+
+@dataclass(frozen=True, slots=True)
 class IntValue:
     value: int
 
     def __repr__(self):
         return (f"{self.value}")
 
-@dataclass
+    def __bool__(self):
+        return bool(self.value)
+
+@dataclass(frozen=True, slots=True)
 class FloatValue:
     value: float
 
     def __repr__(self):
         return (f"{self.value}")
 
-@dataclass
+    def __bool__(self):
+        return bool(self.value)
+
+@dataclass(frozen=True, slots=True)
 class StringValue:
-    value: float
+    value: str
 
     def __repr__(self):
         return (f"{self.value}")
+
+    def __bool__(self):
+        return bool(self.value)
     
-@dataclass
+class ConcatStringValue(StringValue):
+    """
+    A string built by appending to another string, kept as pieces in a
+    list shared with the string it was built from. Each value owns the
+    first `count` pieces; appending to the value that owns the whole list
+    adds one more piece in place instead of copying everything so far.
+    The text is only joined when it is read.
+    """
+    __slots__ = ('parts', 'count', 'text')
+
+    def __init__(self, parts, count):
+        object.__setattr__(self, 'parts', parts)
+        object.__setattr__(self, 'count', count)
+        object.__setattr__(self, 'text', None)
+
+    @property
+    def value(self):
+        if self.text is None:
+            object.__setattr__(self, 'text', ''.join(self.parts[:self.count]))
+        return self.text
+
+    def __eq__(self, other):
+        return isinstance(other, StringValue) and self.value == other.value
+
+    def __hash__(self):
+        return hash((self.value,))
+
+@dataclass(frozen=True, slots=True)
 class BoolValue:
-    value: float
+    value: bool
 
     def __repr__(self):
         return (f"{self.value}")
+
+    def __bool__(self):
+        return bool(self.value)
     
-@dataclass
+@dataclass(slots=True)
 class VariableValue:
     value: any
 
 class NothingValue:
+    __slots__ = ('value',)
+
     def __init__(self, value=None):
         self.value = value
         if value == None:
@@ -62,36 +156,233 @@ class NothingValue:
 
     def __repr__(self):
         return (f"{self.value}")
+
+    def __bool__(self):
+        return False
+
+# Shared instances. Values are immutable, so the common ones are only built once
+SMALL_INT_MIN = -5
+SMALL_INT_MAX = 256
+SMALL_INTS = [IntValue(i) for i in range(SMALL_INT_MIN, SMALL_INT_MAX + 1)]
+TRUE = BoolValue(True)
+FALSE = BoolValue(False)
+NOTHING = NothingValue(None)
+
+# Arguments memoize() caches by: immutable scalars only
+MEMO_KEY_TYPES = frozenset((IntValue, FloatValue, StringValue, ConcatStringValue, BoolValue, NothingValue))
+
+def int_value(value):
+    if SMALL_INT_MIN <= value <= SMALL_INT_MAX:
+        return SMALL_INTS[value - SMALL_INT_MIN]
+    return IntValue(value)
+
+def bool_value(value):
+    return TRUE if value else FALSE
+
+def make_value(value):
+    # Wraps a raw Python result in the matching value, reusing cached instances
+    value_type = value.__class__
+    if value_type is int:
+        if SMALL_INT_MIN <= value <= SMALL_INT_MAX:
+            return SMALL_INTS[value - SMALL_INT_MIN]
+        return IntValue(value)
+    elif value_type is bool:
+        return TRUE if value else FALSE
+    elif value_type is float:
+        return FloatValue(value)
+    elif value_type is str:
+        return StringValue(value)
+    elif value is None:
+        return NOTHING
+    return value
     
-@dataclass
+# Storage behind `array int` and `array float`: 64-bit signed ints and doubles
+ARRAY_TYPECODES = {"int": "q", "float": "d"}
+INT_ARRAY_MIN = -(1 << 63)
+INT_ARRAY_MAX = (1 << 63) - 1
+
+class TypedArray(array):
+    """
+    A numeric array declared with `array int` or `array float`. Elements
+    live unboxed in one contiguous buffer and are only wrapped in an
+    IntValue/FloatValue when read back out.
+    """
+    __slots__ = ()
+
+    def __repr__(self):
+        return (f"{self.tolist()}")
+
+class ArrayView:
+    """
+    The elements [start, stop) of a list or typed array, made by a[start:end].
+    Nothing is copied: reads and writes go to the parent array's storage.
+    """
+    __slots__ = ('base', 'start', 'stop')
+
+    def __init__(self, base, start, stop):
+        self.base = base
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __iter__(self):
+        if self.base.__class__ is TypedArray:
+            return map(make_value, islice(self.base, self.start, self.stop))
+        return islice(self.base, self.start, self.stop)
+
+    def __repr__(self):
+        return (f"{list(self)}")
+
+def map_key(value):
+    """
+    The hashable key a map stores for value. Keys are kept unboxed, so 1,
+    1.0 and True are one key, just as they are == to each other. Only ints,
+    floats, strings, bools and Nothing can be keys.
+    """
+    if value.__class__ is NothingValue:
+        return None
+    key = getattr(value, 'value', value)
+    if key.__class__ not in (int, float, str, bool):
+        raise Exception(f"'{value}' cannot be a map key or set element")
+    return key
+
+def key_value(key):
+    # Boxes a stored key back into the value it was made from
+    return NOTHING if key is None else make_value(key)
+
+class MapValue(dict):
+    """
+    A map made by a {key: value, ...} literal. Keys are stored as map_key()
+    returns them, values as they are.
+    """
+    __slots__ = ()
+
+    def __repr__(self):
+        return "{" + ", ".join(f"{key_value(key)}: {value}" for key, value in self.items()) + "}"
+
+class SetValue(dict):
+    """
+    A set made by set(). Its elements are stored as the keys of a dict,
+    unboxed by map_key() like map keys, so they stay in the order they were
+    added. The dict's values are unused.
+    """
+    __slots__ = ()
+
+    def __repr__(self):
+        return "{" + ", ".join(f"{key_value(key)}" for key in self) + "}"
+
+class StringBuilderValue:
+    """Made by builder(); collects pieces with append() until build() joins them once."""
+    __slots__ = ('parts', 'length')
+
+    def __init__(self):
+        self.parts = []
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def __repr__(self):
+        return (f"{''.join(self.parts)}")
+
+# Free frames kept per function value, enough for moderate recursion without hoarding
+MAX_POOLED_FRAMES = 32
+
+def arity_error(function, args):
+    plural = "" if function.nparams == 1 else "s"
+    raise Exception(f"{function.name}() takes {function.nparams} argument{plural} but {len(args)} were given")
+
+@dataclass(slots=True)
 class FunctionValue:
     name: str
     params: any
     body: any
     env: any
+    frame: any = None
+    nlocals: int = 0
+    nparams: int = 0
+    reuse_frames: bool = False
+    free_frames: list = field(default_factory=list)
+    # Line of the definition, set by the tree interpreter for the profiler
+    line: int = field(default=None, compare=False)
 
     def call(self, interpreter, args):
-        call_env = interpreter.env.__class__(self.env)
-        call_env.enter_scope()
+        return interpreter.call_function(self, args)
+
+    def new_frame(self, args):
+        # The one place arguments are checked and bound, for every engine that uses Frames
+        if len(args) != self.nparams:
+            arity_error(self, args)
+        if self.free_frames:
+            frame = self.free_frames.pop()
+        else:
+            frame = Frame(self.nlocals, self.frame, self.env)
+        frame.slots[:self.nparams] = args
+        return frame
+
+    def rebind_frame(self, frame, args):
+        # Next round of a self tail call: the frame is reused unless an inner function may hold it
+        if not self.reuse_frames:
+            return self.new_frame(args)
+        if len(args) != self.nparams:
+            arity_error(self, args)
+        frame.slots[:self.nparams] = args
+        if self.nlocals > self.nparams:
+            frame.slots[self.nparams:] = [None] * (self.nlocals - self.nparams)
+        return frame
+
+    def release_frame(self, frame):
+        # Only frames no inner function can have captured go back to the pool
+        if self.reuse_frames and len(self.free_frames) < MAX_POOLED_FRAMES:
+            if self.nlocals > self.nparams:
+                frame.slots[self.nparams:] = [None] * (self.nlocals - self.nparams)
+            self.free_frames.append(frame)
+
+class Completion:
+    """
+    Returned, not raised, by a statement that ends the body it is in early.
+    Statement loops hand it up until a loop (break/continue) or a call
+    (return) consumes it. Any other statement result means "carry on".
+    """
+    __slots__ = ('kind', 'value')
 
-        old_env = interpreter.env
-        interpreter.env = call_env
+    def __init__(self, kind, value=None):
+        self.kind = kind
+        self.value = value
+
+    def __repr__(self):
+        return (f"<{self.kind}>")
+
+BREAK = Completion("break")
+CONTINUE = Completion("continue")
+# The tree interpreter keeps the returned value (or pending tail call) itself and only passes this up
+RETURN = Completion("return")
 
-        for param, arg_value in zip(self.params, args):
-            param_name = param.params.identifier if hasattr(param, 'params') else param.identifier
-            call_env.declare(param_name, arg_value)
+@dataclass(slots=True)
+class CompiledFunctionValue(FunctionValue):
+    code: any = None
 
+    def call(self, interpreter, args):
+        call_frame = self.new_frame(args)
         try:
-            for stmt in self.body:
-                interpreter.visit(stmt)
-        except ReturnSignal as r:
-            result = r.value
-            call_env.exit_scope()
-            interpreter.env = old_env
-            return result
-
-        call_env.exit_scope()
-
-class ReturnSignal(Exception):
-    def __init__(self, value):
-        self.value = value
\ No newline at end of file
+            result = self.code(call_frame)
+            while result.__class__ is Completion and result.kind == "tail":
+                callee, args = result.value
+                if callee is not self:
+                    return callee.call(interpreter, args)
+                call_frame = self.rebind_frame(call_frame, args)
+                result = self.code(call_frame)
+        finally:
+            self.release_frame(call_frame)
+        if result.__class__ is Completion:
+            return result.value
+
+@dataclass(slots=True)
+class VMFunctionValue(FunctionValue):
+    code: any = None
+    cells: tuple = ()
+
+    def call(self, interpreter, args):
+        return interpreter.vm.call_function(self, args)
@@ -0,0 +1,253 @@
+from runtime.values_ import *
+from tree import *
+from runtime.interpreter import Interpreter
+from runtime.operations import *
+from runtime.bytecode import *
+
+MAX_FRAMES = 100000
+
+class VM:
+    """
+    Runs CodeObjects produced by runtime.bytecode.Compiler.
+
+    Calls between Orion functions push a frame onto the VM's own frame
+    stack instead of recursing in Python, so nesting depth is bounded by
+    MAX_FRAMES rather than by the Python recursion limit.
+    """
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+
+    def raise_error(self, message):
+        raise Exception(message)
+
+    def call_function(self, function, args):
+        return self.run(function.code, function.env, self.bind_arguments(function, args), function.cells)
+
+    def bind_arguments(self, function, args):
+        if len(args) != function.nparams:
+            arity_error(function, args)
+        local_values = [None] * function.code.nlocals
+        local_values[:function.nparams] = args
+        return local_values
+
+    def bound_reader(self, limit, local_values, cells, global_env):
+        # A counted loop's bound is a variable: read it from wherever it lives, every round
+        identifier, depth, slot = limit
+        if slot is None:
+            return lambda: global_env.get(identifier)
+        elif depth == 0:
+            return lambda: local_values[slot]
+        return lambda: cells[depth - 1][slot]
+
+    def run(self, code, global_env, local_values=None, cells=()):
+        interpreter = self.interpreter
+        binary_operators = BINARY_OPERATORS
+        unary_operators = UNARY_OPERATORS
+
+        frames = []
+        instructions = code.instructions
+        constants = code.constants
+        names = code.names
+        if local_values is None:
+            local_values = [None] * code.nlocals
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+
+        while True:
+            op = instructions[pc]
+            arg = instructions[pc + 1]
+            pc += 2
+
+            if op == LOAD_LOCAL:
+                push(local_values[arg])
+            elif op == LOAD_CONST:
+                push(constants[arg])
+            elif op == BINARY_OP:
+                right = pop()
+                stack[-1] = binary_operators[arg](stack[-1], right)
+            elif op == STORE_LOCAL:
+                local_values[arg] = pop()
+            elif op == JUMP_IF_FALSE:
+                if not pop():
+                    pc = arg
+            elif op == JUMP:
+                pc = arg
+            elif op == FOR_ITER:
+                value = next(stack[-1], stack)
+                if value is stack:
+                    pop()
+                    pc = arg
+                else:
+                    push(value)
+            elif op == LOAD_GLOBAL:
+                push(global_env.get(names[arg]))
+            elif op == POP:
+                pop()
+            elif op == CALL:
+                if arg:
+                    args = stack[-arg:]
+                    del stack[-arg:]
+                else:
+                    args = []
+                func = pop()
+                if type(func) is VMFunctionValue:
+                    if len(frames) >= MAX_FRAMES:
+                        self.raise_error("Maximum recursion depth exceeded")
+                    frames.append((instructions, constants, names, pc, stack, local_values, cells, global_env))
+                    code = func.code
+                    instructions = code.instructions
+                    constants = code.constants
+                    names = code.names
+                    local_values = self.bind_arguments(func, args)
+                    cells = func.cells
+                    global_env = func.env
+                    stack = []
+                    push = stack.append
+                    pop = stack.pop
+                    pc = 0
+                elif isinstance(func, (FunctionValue, BuiltInFunctionValue)):
+                    push(func.call(interpreter, args))
+                else:
+                    self.raise_error(f"'{func}' is not callable")
+            elif op == TAIL_CALL:
+                # Replaces the running frame; the RETURN after it only runs for other callables
+                if arg:
+                    args = stack[-arg:]
+                    del stack[-arg:]
+                else:
+                    args = []
+                func = pop()
+                if type(func) is VMFunctionValue:
+                    code = func.code
+                    instructions = code.instructions
+                    constants = code.constants
+                    names = code.names
+                    local_values = self.bind_arguments(func, args)
+                    cells = func.cells
+                    global_env = func.env
+                    stack = []
+                    push = stack.append
+                    pop = stack.pop
+                    pc = 0
+                elif isinstance(func, (FunctionValue, BuiltInFunctionValue)):
+                    push(func.call(interpreter, args))
+                else:
+                    self.raise_error(f"'{func}' is not callable")
+            elif op == RETURN:
+                value = pop()
+                if not frames:
+                    return value
+                instructions, constants, names, pc, stack, local_values, cells, global_env = frames.pop()
+                push = stack.append
+                pop = stack.pop
+                push(value)
+            elif op == LOAD_DEREF:
+                push(cells[(arg >> DEREF_SHIFT) - 1][arg & DEREF_MASK])
+            elif op == STORE_DEREF:
+                cells[(arg >> DEREF_SHIFT) - 1][arg & DEREF_MASK] = pop()
+            elif op == STORE_GLOBAL:
+                global_env.assign(names[arg], pop())
+            elif op == DECLARE_GLOBAL:
+                global_env.declare(names[arg], pop())
+            elif op == DUP:
+                push(stack[-1])
+            elif op == STEP:
+                stack[-1] = step_value(stack[-1], arg)
+            elif op == NOT:
+                stack[-1] = not stack[-1]
+            elif op == UNARY_OP:
+                stack[-1] = unary_operators[arg](stack[-1])
+            elif op == AND_JUMP:
+                if not stack[-1]:
+                    stack[-1] = False
+                    pc = arg
+                else:
+                    pop()
+            elif op == OR_JUMP:
+                if stack[-1]:
+                    stack[-1] = True
+                    pc = arg
+                else:
+                    pop()
+            elif op == INDEX_GET:
+                index = pop()
+                stack[-1] = index_get(stack[-1], index)
+            elif op == INDEX_SET:
+                value = pop()
+                index = pop()
+                stack[-1] = index_set(stack[-1], index, value)
+            elif op == BUILD_ARRAY:
+                if arg:
+                    elements = stack[-arg:]
+                    del stack[-arg:]
+                else:
+                    elements = []
+                push(elements)
+            elif op == BUILD_MAP:
+                if arg:
+                    entries = stack[-2 * arg:]
+                    del stack[-2 * arg:]
+                else:
+                    entries = []
+                push(build_map(entries))
+            elif op == PACK_ARRAY:
+                stack[-1] = pack_array(stack[-1], names[arg])
+            elif op == CALL_METHOD:
+                argc = arg & MAX_ARGS
+                if argc:
+                    args = stack[-argc:]
+                    del stack[-argc:]
+                else:
+                    args = []
+                stack[-1] = call_method(stack[-1], names[arg >> METHOD_SHIFT], args)
+            elif op == GET_ATTR:
+                obj = stack[-1]
+                if not isinstance(obj, ModuleValue):
+                    self.raise_error(f"{obj} has no attributes")
+                stack[-1] = obj.get(names[arg])
+            elif op == GET_ITER:
+                stack[-1] = iterate(stack[-1])
+            elif op == COUNTED_ITER:
+                comparison, counted, limit = constants[arg]
+                if limit.__class__ is tuple:
+                    limit = self.bound_reader(limit, local_values, cells, global_env)
+                stack[-1] = counted_values(stack[-1], limit, comparison, counted)
+            elif op == GET_METHOD:
+                # A module's function, or the method bound to any other value, for the CALL after it
+                obj = stack[-1]
+                if isinstance(obj, ModuleValue):
+                    stack[-1] = obj.get(names[arg])
+                else:
+                    stack[-1] = bound_method(obj, names[arg])
+            elif op == SLICE:
+                end = pop()
+                start = pop()
+                stack[-1] = slice_array(stack[-1], start, end)
+            elif op == MAKE_FUNCTION:
+                function_code = constants[arg]
+                push(VMFunctionValue(function_code.name, None, None, global_env, nparams=function_code.nparams, code=function_code, cells=(local_values,) + cells))
+            elif op == IMPORT:
+                old_env = interpreter.env
+                interpreter.env = global_env
+                try:
+                    push(interpreter.load_module(constants[arg]))
+                finally:
+                    interpreter.env = old_env
+            else:
+                self.raise_error(f"Unknown opcode {op}")
+
+class VMInterpreter(Interpreter):
+    def __init__(self):
+        super().__init__()
+        self.vm = VM(self)
+
+    def add_hook(self, hook, events=()):
+        # Compiled code never goes back through visit, so there is nothing to hook into
+        self.raise_error("tracing hooks are only supported by the tree engine")
+
+    def interpret(self, tree):
+        if isinstance(tree, ProgramNode):
+            code = Compiler().compile(tree)
+            return self.vm.run(code, self.env)
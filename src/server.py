@@ -0,0 +1,169 @@
+import io
+import os
+import sys
+import json
+import signal
+import socket
+import traceback
+from main import run_file, ENGINES
+from client import STDOUT, STDERR, EXIT, default_socket_path, send_frame
+from runtime.module_registry import ModuleRegistry, STDLIB_MODULES, load_stdlib_module
+from runtime.modules.io import close_open_files
+
+# Connections waiting for accept() before new ones are refused
+BACKLOG = 64
+# Buffered script output is sent once it grows past this
+FLUSH_SIZE = 1 << 16
+# Anyone who can connect can run scripts as the server's user, so nobody else may
+SOCKET_MODE = 0o600
+DIRECTORY_MODE = 0o700
+
+class FrameWriter(io.TextIOBase):
+    """sys.stdout/sys.stderr of a request: text goes back to the client in frames of one kind."""
+    def __init__(self, sock, kind):
+        self.sock = sock
+        self.kind = kind
+        self.parts = []
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= FLUSH_SIZE:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self.parts:
+            send_frame(self.sock, self.kind, "".join(self.parts).encode())
+            self.parts = []
+            self.size = 0
+
+class Server:
+    """
+    Runs scripts for `client.py` on a warm interpreter, over a Unix socket.
+
+    Everything a cold run pays for before the script starts (Python startup,
+    importing the interpreter, load_stdlib, building the stdlib modules)
+    happens once, when the server starts. Each request is then handled by a
+    fork() of the server, so it starts from that ready interpreter, and
+    nothing a script does (globals, imported modules, open files) can leak
+    into the next one.
+    """
+    def __init__(self, socket_path=None, engine="tree", lexer="regex", cache=True, optimize=False):
+        self.socket_path = socket_path or default_socket_path()
+        self.engine = engine
+        self.options = dict(lexer=lexer, cache=cache, optimize=optimize)
+
+        self.interpreter = ENGINES[engine]()
+        self.interpreter.use_cache = cache
+        self.interpreter.optimize = optimize
+        for name in STDLIB_MODULES:
+            load_stdlib_module(name)
+
+    def raise_error(self, message):
+        raise Exception(message)
+
+    def private_directory(self, directory):
+        # The default directory in /tmp could have been made by someone else, waiting for our socket
+        if not os.path.isdir(directory):
+            os.makedirs(directory, mode=DIRECTORY_MODE)
+        info = os.stat(directory)
+        if info.st_uid != os.getuid() or info.st_mode & 0o077:
+            self.raise_error(f"{directory} must belong to you and be closed to other users (mode 0700)")
+
+    def listen(self):
+        if self.socket_path == default_socket_path():
+            self.private_directory(os.path.dirname(self.socket_path))
+        if os.path.exists(self.socket_path):
+            # A socket file nobody answers on was left by a server that died
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+            except OSError:
+                os.remove(self.socket_path)
+            else:
+                self.raise_error(f"a server is already listening on {self.socket_path}")
+            finally:
+                probe.close()
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # The umask keeps the socket closed to others between bind() and chmod()
+        old_umask = os.umask(0o777 & ~SOCKET_MODE)
+        try:
+            listener.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        os.chmod(self.socket_path, SOCKET_MODE)
+        listener.listen(BACKLOG)
+        return listener
+
+    def serve_forever(self):
+        if not hasattr(os, "fork") or not hasattr(socket, "AF_UNIX"):
+            self.raise_error("--serve needs Unix sockets and fork()")
+
+        listener = self.listen()
+        # Stopped with SIGTERM, the server still removes its socket on the way out
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        # Finished requests are collected as they exit, not only when the next one arrives
+        signal.signal(signal.SIGCHLD, lambda signum, frame: self.reap())
+        print(f"orion: serving on {self.socket_path} ({self.engine} engine)", file=sys.stderr)
+        try:
+            while True:
+                conn, _ = listener.accept()
+                if os.fork() == 0:
+                    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                    listener.close()
+                    os._exit(self.handle(conn))
+                conn.close()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            listener.close()
+            os.remove(self.socket_path)
+
+    def reap(self):
+        # Collects finished requests so they do not linger as zombies
+        try:
+            while os.waitpid(-1, os.WNOHANG)[0]:
+                pass
+        except ChildProcessError:
+            pass
+
+    def handle(self, conn):
+        """Runs one request in a forked child and returns the exit status to end it with."""
+        stdout = FrameWriter(conn, STDOUT)
+        stderr = FrameWriter(conn, STDERR)
+        sys.stdout, sys.stderr = stdout, stderr
+        sys.stdin = open(os.devnull)
+        status = 0
+        try:
+            request = json.loads(conn.makefile("rb").readline())
+            os.chdir(request["cwd"])
+            # Module lookups start from the client's working directory, not the server's
+            self.interpreter.modules = ModuleRegistry()
+            run_file(request["script"], engine=self.engine, interpreter=self.interpreter, **self.options)
+        except SystemExit as error:
+            status = error.code if isinstance(error.code, int) else (0 if error.code is None else 1)
+        except BaseException:
+            traceback.print_exc()
+            status = 1
+        # os._exit skips atexit, so files the script left open are closed here
+        try:
+            close_open_files()
+        except OSError:
+            traceback.print_exc()
+
+        try:
+            stdout.flush()
+            stderr.flush()
+            send_frame(conn, EXIT, str(status).encode())
+            conn.close()
+        except OSError:
+            # The client went away; there is nobody left to tell
+            pass
+        return status
@@ -1,20 +1,21 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
-@dataclass
+@dataclass(slots=True)
 class ProgramNode:
     body: list
+    nlocals: int = field(default=None, compare=False) # set by the resolver
 
     def __repr__(self):
         return (f"PROGRAM({self.body})")
     
-@dataclass
+@dataclass(slots=True)
 class NotNode:
     body: any
 
     def __repr__(self):
         return (f"(NOT({self.body}))")
 
-@dataclass
+@dataclass(slots=True)
 class BinaryOpNode:
     left: any
     op: any
@@ -24,21 +25,29 @@ class BinaryOpNode:
     def __repr__(self):
         return (f"({self.left} {self.op.value} {self.right})")
 
-@dataclass
+@dataclass(slots=True)
 class NothingLiteralNode:
     literal: None
 
     def __repr__(self):
         return (f"Nothing") if self.literal == None else ("(ERROR_VALUE)")
 
-@dataclass
+@dataclass(slots=True)
 class LiteralNode:
     literal: any
+    value: any = field(default=None, compare=False) # built once by the parser
 
     def __repr__(self):
         return str(self.literal.value)
     
-@dataclass
+@dataclass(slots=True)
+class ConstantNode:
+    value: any # set by the optimizer
+
+    def __repr__(self):
+        return (f"CONST({self.value})")
+
+@dataclass(slots=True)
 class UnaryOpNode:
     op: any
     operand: any
@@ -46,22 +55,35 @@ class UnaryOpNode:
     def __repr__(self):
         return (f"{self.op.value}{self.operand}")
 
-@dataclass
+@dataclass(slots=True)
 class PostfixOpNode: ###
     identifier: str
     op: any
+    depth: int = field(default=None, compare=False)
+    slot: int = field(default=None, compare=False)
 
     def __repr__(self):
         return (f"({self.identifier}{self.op.value})")
     
-@dataclass
+@dataclass(slots=True)
 class ArrayNode:
     elements: list
+    kind: str = None # "int" or "float" for a packed numeric array
 
     def __repr__(self):
+        if self.kind:
+            return f"ARRAY {self.kind}({self.elements})"
         return f"ARRAY({self.elements})"
     
-@dataclass
+@dataclass(slots=True)
+class MapNode:
+    keys: list
+    values: list
+
+    def __repr__(self):
+        return f"MAP({', '.join(f'{key}: {value}' for key, value in zip(self.keys, self.values))})"
+
+@dataclass(slots=True)
 class IndexAccessNode:
     array: any
     index: any
@@ -69,7 +91,16 @@ class IndexAccessNode:
     def __repr__(self):
         return f"({self.array}[{self.index}])"
     
-@dataclass
+@dataclass(slots=True)
+class SliceNode:
+    array: any
+    start: any
+    end: any
+
+    def __repr__(self):
+        return f"({self.array}[{self.start}:{self.end}])"
+
+@dataclass(slots=True)
 class IndexAssignNode:
     array: any
     index: any
@@ -78,30 +109,35 @@ class IndexAssignNode:
     def __repr__(self):
         return f"({self.array}[{self.index}] = {self.value})"
     
-@dataclass
+@dataclass(slots=True)
 class VariableNode:
     identifier: str
+    depth: int = field(default=None, compare=False)
+    slot: int = field(default=None, compare=False)
 
     def __repr__(self):
         return (f"({self.identifier})")
     
-@dataclass
+@dataclass(slots=True)
 class VarDeclNode:
     identifier: any
     value: any = None
+    slot: int = field(default=None, compare=False)
 
     def __repr__(self):
         return (f"(var {self.identifier} = {self.value})")
     
-@dataclass
+@dataclass(slots=True)
 class AssignNode:
     identifier: any
     value: any
+    depth: int = field(default=None, compare=False)
+    slot: int = field(default=None, compare=False)
 
     def __repr__(self):
         return (f"({self.identifier} = {self.value})")
     
-@dataclass
+@dataclass(slots=True)
 class IfNode:
     condition: any
     body: list
@@ -110,7 +146,14 @@ class IfNode:
     def __repr__(self):
         return (f"(IF {self.condition} THEN \n\t{self.body} \n\tELSE {self.else_body})")
 
-@dataclass
+@dataclass(slots=True)
+class BlockNode:
+    body: list
+
+    def __repr__(self):
+        return (f"(BLOCK {self.body})")
+
+@dataclass(slots=True)
 class WhileNode:
     condition: any
     body: list
@@ -118,48 +161,67 @@ class WhileNode:
     def __repr__(self):
         return (f"(WHILE {self.condition} DO {self.body})")
 
-@dataclass
+@dataclass(slots=True)
 class ForNode:
     init: any
     condition: any
     increment: any
     body: list
+    counted: tuple = field(default=None, compare=False) # (step, bound offset, increment kind) for a counted loop, set by the resolver
 
     def __repr__(self):
         return (f"(FOR {self.init}; {self.condition}; {self.increment} DO {self.body})")
+
+@dataclass(slots=True)
+class ForInNode:
+    identifier: str
+    iterable: any
+    body: list
+    slot: int = field(default=None, compare=False)
+
+    def __repr__(self):
+        return (f"(FOR {self.identifier} IN {self.iterable} DO {self.body})")
     
-@dataclass
+@dataclass(slots=True)
 class ParameterNode:
     params: any
+    slot: int = field(default=None, compare=False)
 
     def __repr__(self):
         return f"({self.params})"
     
-@dataclass
+@dataclass(slots=True)
 class ArgumentNode:
     args: any
 
     def __repr__(self):
         return f"({self.args})"
         
-@dataclass
+@dataclass(slots=True)
 class FunctionDefNode:
     name: str
     params: ParameterNode
     body: any
+    slot: int = field(default=None, compare=False)
+    nlocals: int = field(default=0, compare=False)
+    reuse_frames: bool = field(default=False, compare=False)
+    # Line of the `fn` keyword, for reports that point back at the source
+    line: int = field(default=None, compare=False)
 
     def __repr__(self):
         return (f"(FUNCTION {self.name}({self.params}) DO {self.body})")
     
-@dataclass
+@dataclass(slots=True)
 class FunctionCallNode:
     name: str
     args: list
+    depth: int = field(default=None, compare=False)
+    slot: int = field(default=None, compare=False)
 
     def __repr__(self):
         return (f"(CALL {self.name.value}({self.args}))")
     
-@dataclass
+@dataclass(slots=True)
 class MethodCallNode:
     object_expr: any
     method_name: any
@@ -168,16 +230,17 @@ class MethodCallNode:
     def __repr__(self):
         return (f"({self.object_expr}.{self.method_name}({self.args}))")
     
-@dataclass
+@dataclass(slots=True)
 class ImportNode:
     name: str
     path: str
+    slot: int = field(default=None, compare=False)
 
     def __repr__(self):
         return (f"IMPORT({self.path} AS {self.name})")
     
 
-@dataclass
+@dataclass(slots=True)
 class AttributeAccessNode:
     obj: any
     attr: any
@@ -185,9 +248,22 @@ class AttributeAccessNode:
     def __repr__(self):
         return (f"(ATTR {self.obj}.{self.attr})")
 
-@dataclass
+@dataclass(slots=True)
 class ReturnNode:
     value: any
+    tail_call: bool = field(default=False, compare=False)
+
+    def __repr__(self):
+        if self.tail_call:
+            return (f"RETURN TAIL {self.value}")
+        return (f"RETURN {self.value}")
+
+@dataclass(slots=True)
+class BreakNode:
+    def __repr__(self):
+        return ("BREAK")
 
+@dataclass(slots=True)
+class ContinueNode:
     def __repr__(self):
-        return (f"RETURN {self.value}")
\ No newline at end of file
+        return ("CONTINUE")
\ No newline at end of file
@@ -0,0 +1,46 @@
+import os
+import io
+import sys
+import shutil
+import socket
+import tempfile
+import unittest
+import threading
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from client import run_remote, send_frame, STDOUT, LOST_SERVER
+
+class LostServerTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="orion-client-")
+        self.socket_path = os.path.join(self.directory, "orion.sock")
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(self.socket_path)
+        self.listener.listen(1)
+
+    def tearDown(self):
+        self.listener.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def die_mid_request(self):
+        # Answers with some output, then half a frame header, then goes away like a crashed child
+        conn, _ = self.listener.accept()
+        with conn:
+            conn.makefile("rb").readline()
+            send_frame(conn, STDOUT, b"partial\n")
+            conn.sendall(STDOUT + b"\x00")
+
+    def test_connection_closed_mid_request(self):
+        server = threading.Thread(target=self.die_mid_request)
+        server.start()
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            status = run_remote(os.path.join(self.directory, "script.or"), self.socket_path)
+        server.join()
+        self.assertEqual(status, LOST_SERVER)
+        self.assertEqual(stderr.getvalue(), "orion: server closed the connection\n")
+
+if __name__ == '__main__':
+    unittest.main()
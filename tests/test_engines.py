@@ -0,0 +1,372 @@
+import os
+import io
+import sys
+import shutil
+import tempfile
+import unittest
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from main import run_file, ENGINES
+
+class EngineTestCase(unittest.TestCase):
+    """Runs each program on every engine, with and without -O, and expects the same output from all of them."""
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="orion-engines-")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def run_program(self, source, engine, optimize):
+        script = os.path.join(self.directory, "program.or")
+        with open(script, "w") as file:
+            file.write(source)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            run_file(script, engine=engine, cache=False, optimize=optimize)
+        return output.getvalue()
+
+    def assertFails(self, source, message):
+        for engine in ENGINES:
+            for optimize in (False, True):
+                with self.subTest(engine=engine, optimize=optimize):
+                    with self.assertRaisesRegex(Exception, message):
+                        self.run_program(source, engine, optimize)
+
+    def assertOutput(self, source, expected):
+        for engine in ENGINES:
+            for optimize in (False, True):
+                with self.subTest(engine=engine, optimize=optimize):
+                    self.assertEqual(self.run_program(source, engine, optimize), expected)
+
+class ControlFlowTest(EngineTestCase):
+    def test_arithmetic_and_strings(self):
+        self.assertOutput("""var a = 7;
+var b = 2;
+print(a + b * 3, a - b, a * b, a / b);
+print(1.5 * 2, -a);
+var s = "ab" + "cd";
+print(s, size(s));
+if (s == "abcd"):
+    print("equal");
+end
+""", "13\n5\n14\n3.5\n3.0\n-7\nabcd\n4\nequal\n")
+
+    def test_if_else(self):
+        self.assertOutput("""fn sign(n):
+    if (n < 0):
+        return -1;
+    end
+    if (n > 0):
+        return 1;
+    else:
+        return 0;
+    end
+end
+print(sign(5), sign(-3), sign(0));
+""", "1\n-1\n0\n")
+
+    def test_break_and_continue(self):
+        self.assertOutput("""var total = 0;
+for (var i = 0; i < 10; i++):
+    if (i == 3):
+        continue;
+    end
+    if (i == 7):
+        break;
+    end
+    total = total + i;
+end
+print(total);
+var n = 0;
+while (True):
+    n = n + 1;
+    if (n < 5):
+        continue;
+    end
+    break;
+end
+print(n);
+""", "18\n5\n")
+
+    def test_break_only_leaves_the_inner_loop(self):
+        self.assertOutput("""var pairs = 0;
+for (var i = 0; i < 4; i++):
+    var j = 0;
+    while (True):
+        j = j + 1;
+        if (j > i):
+            break;
+        end
+        pairs = pairs + 1;
+    end
+end
+print(pairs);
+""", "6\n")
+
+    def test_return_from_inside_loops(self):
+        self.assertOutput("""fn first_square_over(limit):
+    for (var j = 0; j < 100; j++):
+        var k = 0;
+        while (k < 100):
+            k = k + 1;
+            if (k > 2):
+                break;
+            end
+        end
+        if (j * j > limit):
+            return j;
+        end
+    end
+    return -1;
+end
+fn find_in(values, wanted):
+    for v in values:
+        if (v == wanted):
+            return "found";
+        end
+    end
+    return "missing";
+end
+print(first_square_over(50), first_square_over(100000));
+print(find_in([1, 2, 3], 2), find_in([1, 2, 3], 9));
+""", "8\n-1\nfound\nmissing\n")
+
+    def test_function_without_return(self):
+        self.assertOutput("""fn noret(x):
+    print(x);
+end
+print(noret(4));
+""", "4\nNone\n")
+
+class ScopeTest(EngineTestCase):
+    def test_closures_capture_their_own_frame(self):
+        self.assertOutput("""fn make(n):
+    fn get():
+        return n;
+    end
+    return get;
+end
+var a = make(1);
+var b = make(2);
+print(a(), b());
+""", "1\n2\n")
+
+    def test_closures_share_and_update_a_variable(self):
+        self.assertOutput("""fn counter():
+    var count = 0;
+    fn next():
+        count = count + 1;
+        return count;
+    end
+    return next;
+end
+var c = counter();
+c();
+c();
+var d = counter();
+print(c(), d());
+""", "3\n1\n")
+
+    def test_functions_update_globals(self):
+        self.assertOutput("""var total = 0;
+fn add(n):
+    total = total + n;
+end
+for i in range(5):
+    add(i);
+end
+print(total);
+""", "10\n")
+
+    def test_arrays_and_maps(self):
+        self.assertOutput("""var x = [1, 2, 3, 4, 5];
+x[0] = 10;
+var middle = x[1:4];
+middle[0] = 20;
+print(x, size(middle));
+var ages = {"ann": 30};
+ages["bob"] = 25;
+print(ages["ann"] + ages["bob"], ages.keys());
+""", "[10, 20, 3, 4, 5]\n3\n55\n[ann, bob]\n")
+
+    def test_imports(self):
+        with open(os.path.join(self.directory, "helpers.or"), "w") as file:
+            file.write("var base = 40;\nfn add(n):\n    return base + n;\nend\n")
+        self.assertOutput("""import helpers;
+import helpers as h;
+print(helpers.add(2), h.base);
+""", "42\n40\n")
+
+class CallTest(EngineTestCase):
+    def test_recursion_does_not_share_pooled_frames(self):
+        self.assertOutput("""fn sum_to(n):
+    if (n == 0):
+        return 0;
+    end
+    var here = n;
+    var rest = sum_to(n - 1);
+    return here + rest;
+end
+fn fib(n):
+    if (n < 2):
+        return n;
+    end
+    return fib(n - 1) + fib(n - 2);
+end
+print(sum_to(50), fib(15));
+for i in range(3):
+    print(sum_to(i));
+end
+""", "1275\n610\n0\n1\n3\n")
+
+    def test_tail_calls_deeper_than_the_python_stack(self):
+        self.assertOutput("""fn count(n, total):
+    if (n == 0):
+        return total;
+    end
+    return count(n - 1, total + 1);
+end
+print(count(50000, 0));
+""", "50000\n")
+
+    def test_closures_keep_the_frame_a_tail_call_left(self):
+        self.assertOutput("""fn collect(n, found):
+    if (n == 0):
+        return found;
+    end
+    fn get():
+        return n;
+    end
+    found[n - 1] = get;
+    return collect(n - 1, found);
+end
+var getters = collect(3, [0, 0, 0]);
+var first = getters[0];
+var last = getters[2];
+print(first(), last());
+""", "1\n3\n")
+
+    def test_closures_keep_a_returned_frame(self):
+        self.assertOutput("""fn make(n):
+    var doubled = n * 2;
+    fn get():
+        return doubled;
+    end
+    return get;
+end
+var getters = [0, 0, 0];
+for i in range(3):
+    getters[i] = make(i);
+end
+var a = getters[0];
+var c = getters[2];
+print(a(), c());
+""", "0\n4\n")
+
+    def test_arity_is_checked(self):
+        self.assertFails("""fn pair(a, b):
+    return a;
+end
+pair(1);
+""", "takes 2 arguments but 1 were given")
+
+class LoopTest(EngineTestCase):
+    def test_counted_loops(self):
+        self.assertOutput("""var out = builder();
+for (var i = 0; i < 5; i++):
+    out.append(i);
+end
+for (var i = 1; i <= 3; i++):
+    out.append(i);
+end
+for (var i = 10; i > 0; i = i - 4):
+    out.append(i);
+end
+for (var i = 3; i >= 1; i--):
+    out.append(i);
+end
+for (var i = 0; i < 10; i = i + 3):
+    out.append(i);
+end
+print(out.build());
+""", "0123412310623210369\n")
+
+    def test_bound_variable_changed_by_the_body(self):
+        self.assertOutput("""var n = 10;
+var runs = 0;
+for (var i = 0; i < n; i++):
+    n = n - 1;
+    runs = runs + 1;
+end
+print(runs, n);
+""", "5\n5\n")
+
+    def test_loop_variable_changed_by_the_body(self):
+        self.assertOutput("""var seen = builder();
+for (var i = 0; i < 10; i++):
+    seen.append(i);
+    i = i + 2;
+end
+print(seen.build());
+""", "0369\n")
+
+    def test_break_continue_and_return_in_counted_loops(self):
+        self.assertOutput("""fn first_multiple(k, limit):
+    for (var i = 1; i < limit; i++):
+        if (i < k):
+            continue;
+        end
+        if (i - (i / k) * k == 0):
+            return i;
+        end
+    end
+    return -1;
+end
+var total = 0;
+for (var i = 0; i < 100; i++):
+    if (i == 5):
+        break;
+    end
+    total = total + i;
+end
+print(total, first_multiple(4, 10), first_multiple(4, 3));
+""", "10\n4\n-1\n")
+
+    def test_closures_over_the_loop_variable(self):
+        # One loop variable for the whole loop, so every closure sees its last value
+        self.assertOutput("""var getters = [0, 0, 0];
+for (var i = 0; i < 3; i++):
+    fn get():
+        return i;
+    end
+    getters[i] = get;
+end
+var first = getters[0];
+var last = getters[2];
+print(first(), last());
+""", "3\n3\n")
+
+    def test_for_in(self):
+        self.assertOutput("""var out = builder();
+for i in range(2, 12, 3):
+    out.append(i);
+end
+for i in range(10, 0, -4):
+    out.append(i);
+end
+for c in "abc":
+    out.append(c);
+end
+for v in [7, 8]:
+    out.append(v);
+end
+for k in {"x": 1, "y": 2}:
+    out.append(k);
+end
+print(out.build());
+""", "258111062abc78xy\n")
+
+if __name__ == '__main__':
+    unittest.main()
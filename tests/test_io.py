@@ -0,0 +1,39 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(ROOT, "src", "cli.py")
+ENGINES = ("tree", "closure", "vm")
+
+UNCLOSED_WRITE = """import io;
+var f = io.open("out.txt", "w");
+f.write_line("hello");
+f.write("world");
+"""
+
+class UnclosedFileTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="orion-io-")
+        self.script = os.path.join(self.directory, "write.or")
+        with open(self.script, "w") as file:
+            file.write(UNCLOSED_WRITE)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_write_without_close_reaches_the_file(self):
+        output = os.path.join(self.directory, "out.txt")
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                if os.path.exists(output):
+                    os.remove(output)
+                subprocess.run([sys.executable, CLI, self.script, "--engine", engine, "--no-cache"], cwd=self.directory, check=True)
+                with open(output) as file:
+                    self.assertEqual(file.read(), "hello\nworld")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(ROOT, "src", "cli.py")
+
+METHOD_CALLS = """var m = {1: 2, 3: 4};
+print(m.keys());
+var total = 0;
+for k in m.values():
+    total = total + k;
+end
+print(total);
+"""
+
+MEMOIZED = """fn fib(n):
+    if (n < 2):
+        return n;
+    end
+    return fib(n - 1) + fib(n - 2);
+end
+fib = memoize(fib);
+print(fib(30));
+"""
+
+SAME_NAMES = """fn a():
+    fn helper():
+        return 1;
+    end
+    return helper();
+end
+fn b():
+    fn helper():
+        return 2;
+    end
+    return helper() + helper();
+end
+print(a() + b());
+"""
+
+class ProfileTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="orion-profile-")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def profile(self, source):
+        script = os.path.join(self.directory, "script.or")
+        with open(script, "w") as file:
+            file.write(source)
+        result = subprocess.run([sys.executable, CLI, script, "--profile", "--no-cache"], capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        # The script's output goes to stdout, the profile to stderr
+        return result.stdout, result.stderr
+
+    def test_method_calls(self):
+        output, profile = self.profile(METHOD_CALLS)
+        self.assertEqual(output, "[1, 3]\n6\n")
+        self.assertIn("AttributeAccessNode", profile)
+
+    def test_memoized_function_has_its_own_entry(self):
+        output, profile = self.profile(MEMOIZED)
+        self.assertEqual(output, "832040\n")
+        rows = self.function_rows(profile)
+        # Every call goes through the cache, and the function itself only runs on a miss
+        self.assertEqual(rows["<memo fib> line 1"], 59)
+        self.assertEqual(rows["fib() line 1"], 31)
+
+    def test_functions_sharing_a_name(self):
+        output, profile = self.profile(SAME_NAMES)
+        self.assertEqual(output, "5\n")
+        rows = self.function_rows(profile)
+        self.assertEqual(rows["helper() line 2"], 1)
+        self.assertEqual(rows["helper() line 8"], 2)
+
+    def function_rows(self, profile):
+        # function label -> calls, from the summary's function table
+        rows = {}
+        for line in profile.splitlines():
+            parts = line.split(None, 4)
+            if len(parts) == 5 and parts[0].isdigit():
+                rows[parts[4]] = int(parts[0])
+        return rows
+
+if __name__ == '__main__':
+    unittest.main()
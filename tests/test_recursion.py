@@ -0,0 +1,42 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(ROOT, "src", "cli.py")
+ENGINES = ("tree", "closure", "vm")
+
+# Deepest non-tail recursion the baseline tree interpreter ran under Python's default limit, less a little slack
+BASELINE_DEPTH = 150
+
+NON_TAIL_RECURSION = """fn f(n):
+    if (n == 0):
+        return 0;
+    end
+    return 1 + f(n - 1);
+end
+print(f({depth}));
+"""
+
+class RecursionDepthTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="orion-recursion-")
+        self.script = os.path.join(self.directory, "recurse.or")
+        with open(self.script, "w") as file:
+            file.write(NON_TAIL_RECURSION.format(depth=BASELINE_DEPTH))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_baseline_depth(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                result = subprocess.run([sys.executable, CLI, self.script, "--engine", engine, "--no-cache"], capture_output=True, text=True)
+                self.assertNotIn("RecursionError", result.stderr + result.stdout)
+                self.assertEqual(result.stdout.strip(), str(BASELINE_DEPTH))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import io
+import sys
+import _thread
+import threading
+import unittest
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from repl import Repl
+from runtime.interpreter import Interpreter
+
+class ReplTest(unittest.TestCase):
+    def setUp(self):
+        self.repl = Repl(Interpreter())
+
+    def run_lines(self, *lines):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            for line in lines:
+                self.repl.feed(line)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_interrupt_keeps_the_session(self):
+        self.run_lines("var x = 5;")
+        timer = threading.Timer(0.2, _thread.interrupt_main)
+        timer.start()
+        try:
+            _, errors = self.run_lines("while (True):", "x = x;", "end")
+        finally:
+            timer.cancel()
+        self.assertIn("Interrupted", errors)
+        output, _ = self.run_lines("print(x + 1);")
+        self.assertEqual(output, "6\n")
+
+    def test_failed_redeclaration_keeps_the_old_value(self):
+        self.run_lines("var x = 5;")
+        _, errors = self.run_lines("var x = 1 / 0;")
+        self.assertTrue(errors)
+        output, _ = self.run_lines("print(x);")
+        self.assertEqual(output, "5\n")
+
+    def test_redeclaration_replaces_the_value(self):
+        self.run_lines("var x = 5;", "var x = 7;")
+        output, _ = self.run_lines("print(x);")
+        self.assertEqual(output, "7\n")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(ROOT, "src", "cli.py")
+ENGINES = ("tree", "closure", "vm")
+
+LATER_SIBLINGS = """fn check(n):
+    fn is_even(k):
+        if (k == 0):
+            return True;
+        end
+        return is_odd(k - 1);
+    end
+    fn is_odd(k):
+        if (k == 0):
+            return False;
+        end
+        return is_even(k - 1);
+    end
+    var base = 10;
+    fn offset():
+        return base + n;
+    end
+    print(offset());
+    return is_even(n);
+end
+print(check(4));
+print(check(7));
+"""
+
+class LaterDeclarationTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="orion-resolver-")
+        self.script = os.path.join(self.directory, "siblings.or")
+        with open(self.script, "w") as file:
+            file.write(LATER_SIBLINGS)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_nested_functions_see_names_declared_after_them(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                result = subprocess.run([sys.executable, CLI, self.script, "--engine", engine, "--no-cache"], capture_output=True, text=True)
+                self.assertEqual(result.stderr, "")
+                self.assertEqual(result.stdout.split(), ["14", "True", "17", "False"])
+
+if __name__ == '__main__':
+    unittest.main()
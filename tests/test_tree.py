@@ -0,0 +1,37 @@
+import os
+import sys
+import copy
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from loader import parse_source
+from resolver import Resolver
+
+PROGRAM = """var total = 0;
+fn count(n, acc):
+    if (n == 0):
+        return acc;
+    end
+    return count(n - 1, acc + 1);
+end
+fn outer(k):
+    fn inner():
+        return k;
+    end
+    return inner();
+end
+for (var i = 0; i < 10; i++):
+    total = total + outer(i);
+end
+print(count(total, 0));
+"""
+
+class NodeEqualityTest(unittest.TestCase):
+    def test_resolving_does_not_change_equality(self):
+        tree = parse_source(PROGRAM, "regex")
+        resolved = Resolver().resolve(copy.deepcopy(tree))
+        self.assertEqual(tree, resolved)
+
+if __name__ == '__main__':
+    unittest.main()